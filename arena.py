@@ -0,0 +1,154 @@
+import io
+import sys
+import argparse
+import functools
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Tuple
+
+import hooks
+import kalioz
+import klemek
+import log
+from protocol import Reader, encode
+from referee import Referee
+from replay import Writer
+
+
+class Bot(ABC):
+    """drives one bot in-process from the referee protocol lines"""
+
+    def __init__(self, init_lines: List[str]):
+        self.reader = Reader(io.BytesIO())
+        self.reader.feed(encode(init_lines))
+
+    @abstractmethod
+    def play(self, lines: List[str]) -> str:
+        """the output line of the bot for the frame lines"""
+
+    def record(self, writer: Writer):
+        """write each turn played to a replay file, bots without a state record nothing"""
+
+
+class KaliozBot(Bot):
+    def __init__(self, init_lines: List[str], search_time: float = None,
+                 params: kalioz.Parameters = None, use_book: bool = False):
+        super().__init__(init_lines)
+        self.forest = kalioz.Forest(reader=self.reader, params=params)
+        self.forest.use_book = use_book
+        if search_time is not None:
+            self.forest.search_time = search_time
+
+    def play(self, lines: List[str]) -> str:
+        self.reader.feed(encode(lines))
+        self.forest.read_inputs_loop()
+        return self.forest.best_action()
+
+    def record(self, writer: Writer):
+        self.forest.replay = writer
+
+
+class KlemekBot(Bot):
+    def __init__(self, init_lines: List[str], search_time: float = None,
+                 params: klemek.Parameters = None, use_book: bool = False):
+        super().__init__(init_lines)
+        self.game = klemek.Game(params)
+        self.game.use_book = use_book
+        self.game.input_cells(self.reader.read_cells())
+        if search_time is not None:
+            self.game.search_time = search_time
+
+    def play(self, lines: List[str]) -> str:
+        self.reader.feed(encode(lines))
+        self.game.input_frame(self.reader.read_frame())
+        return " ".join(map(str, self.game.best_move()))
+
+    def record(self, writer: Writer):
+        self.game.replay = writer
+
+
+BOTS: Dict[str, Callable[..., Bot]] = {
+    "kalioz": KaliozBot,
+    "klemek": KlemekBot,
+}
+
+
+def set_log_level(level: int, echo: int):
+    kalioz.LOG.set_level(level, echo)
+    klemek.LOG.set_level(level, echo)
+
+
+def silence():
+    set_log_level(log.OFF, log.OFF)
+
+
+def play_match(first: Callable[..., Bot], second: Callable[..., Bot], seed: int = None,
+               search_time: float = None, replay: str = None) -> Referee:
+    """play a full game, return the referee in its final state
+
+    the turns of both bots are appended to the `replay` file if given
+    """
+    referee = Referee(seed)
+    init_lines = referee.board.lines()
+    bots = [first(init_lines, search_time), second(init_lines, search_time)]
+    writers = [Writer(replay) for _ in bots] if replay is not None else []
+    for bot, writer in zip(bots, writers):
+        bot.record(writer)
+    while not referee.over:
+        actions = {
+            player: bots[player].play(referee.frame_lines(player))
+            for player in referee.active_players()
+        }
+        referee.play(actions)
+    winner = referee.winner()
+    for player, writer in enumerate(writers):
+        writer.end_game(0 if winner < 0 else 1 if winner == player else -1)
+        writer.close()
+    return referee
+
+
+def play_series(first: str, second: str, games: int, seed: int = 0,
+                search_time: float = None, replay: str = None) -> Tuple[int, int, int]:
+    """play both seats of each map, return (first wins, second wins, draws)"""
+    results = [0, 0, 0]
+    for game in range(games):
+        swap = game % 2 == 1
+        bots = (BOTS[second], BOTS[first]) if swap else (BOTS[first], BOTS[second])
+        winner = play_match(*bots, seed + game // 2, search_time, replay).winner()
+        if winner >= 0 and swap:
+            winner = 1 - winner
+        results[winner] += 1
+    return results[0], results[1], results[2]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="play local matches between the bots")
+    parser.add_argument("first", choices=BOTS)
+    parser.add_argument("second", choices=BOTS)
+    parser.add_argument("-n", "--games", type=int, default=10)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-t", "--search-time", type=float,
+                        help="seconds of search per frame, 0 for greedy play")
+    parser.add_argument("-r", "--replay", metavar="PATH",
+                        help="append the turns played to a binary replay file")
+    parser.add_argument("--book", action="store_true",
+                        help="play the opening book moves when searching, off by default")
+    parser.add_argument("--hooks", action="store_true",
+                        help="time the bots scoring functions, one line per turn with the calls "
+                             "of both bots since the last line")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="write all the bots logs")
+    args = parser.parse_args()
+    if args.verbose:
+        set_log_level(log.DEBUG, log.DEBUG)
+    else:
+        silence()
+    if args.hooks:
+        hooks.enable_hooks()
+    if args.book:
+        for name, driver in BOTS.items():
+            BOTS[name] = functools.partial(driver, use_book=True)
+    wins, losses, draws = play_series(
+        args.first, args.second, args.games, args.seed, args.search_time, args.replay)
+    print(f"{args.first} {wins} - {losses} {args.second} ({draws} draws)",
+          file=sys.stdout)
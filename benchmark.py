@@ -0,0 +1,154 @@
+import os
+import sys
+import gzip
+import json
+import math
+import time
+import random
+import argparse
+from typing import Callable, Dict, List
+
+import arena
+from referee import MAX_DAY, Referee
+
+TURN_LIMIT = 0.1  # seconds CodinGame gives to answer a frame
+CORPUS = "benchmark.json.gz"
+
+PHASES = {"early": range(0, 8), "mid": range(8, 16), "late": range(16, MAX_DAY + 1)}
+DENSITIES = {"sparse": range(0, 10), "medium": range(10, 20), "dense": range(20, 30), "30+": range(30, 38)}
+
+# seat policies of the recorded games, the sowers fill the board the bots keep sparse
+MATCHUPS = [
+    ("kalioz", "klemek"),
+    ("klemek", "kalioz"),
+    ("kalioz", "sower"),
+    ("klemek", "sower"),
+    ("sower", "sower"),
+]
+
+
+class Sower(arena.Bot):
+    """random player seeding whenever it can, for crowded boards"""
+
+    def __init__(self, init_lines: List[str], search_time: float = None):
+        super().__init__(init_lines, search_time)
+        self.rng = random.Random(" ".join(init_lines))
+
+    def play(self, lines: List[str]) -> str:
+        day = int(lines[0])
+        moves = lines[6 + int(lines[4]):]
+        seeds = [move for move in moves if move.startswith("SEED")]
+        grows = [move for move in moves if move.startswith("GROW")]
+        completes = [move for move in moves if move.startswith("COMPLETE")]
+        if len(seeds) > 0 and self.rng.random() < 0.7:
+            return self.rng.choice(seeds)
+        if len(grows) > 0 and self.rng.random() < 0.8:
+            return self.rng.choice(grows)
+        if len(completes) > 0 and day >= 20:
+            return self.rng.choice(completes)
+        return "WAIT"
+
+
+PLAYERS: Dict[str, Callable[..., arena.Bot]] = {**arena.BOTS, "sower": Sower}
+
+
+def record_game(first: str, second: str, seed: int) -> dict:
+    """the frames both players received during one greedy game"""
+    referee = Referee(seed)
+    init_lines = referee.board.lines()
+    players = [PLAYERS[first](init_lines, 0), PLAYERS[second](init_lines, 0)]
+    turns = []
+    while not referee.over:
+        actions = {}
+        for player in referee.active_players():
+            lines = referee.frame_lines(player)
+            turns.append([player, lines])
+            actions[player] = players[player].play(lines)
+        referee.play(actions)
+    return {"seed": seed, "players": [first, second], "init": init_lines, "turns": turns}
+
+
+def record(path: str, games: int):
+    corpus = [
+        record_game(first, second, seed)
+        for seed in range(games)
+        for first, second in MATCHUPS
+    ]
+    with gzip.open(path, "wt") as output:
+        json.dump(corpus, output)
+
+
+def load(path: str) -> List[dict]:
+    with gzip.open(path, "rt") as source:
+        return json.load(source)
+
+
+def replay(bot: str, corpus: List[dict], search_time: float = None) -> List[tuple]:
+    """(day, tree count, seconds) of every recorded frame, played in order from both seats"""
+    samples = []
+    for game in corpus:
+        for seat in range(2):
+            player = PLAYERS[bot](game["init"], search_time)
+            for turn_player, lines in game["turns"]:
+                if turn_player != seat:
+                    continue
+                start = time.perf_counter()
+                player.play(lines)
+                samples.append((int(lines[0]), int(lines[4]), time.perf_counter() - start))
+    return samples
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """nearest-rank percentile of sorted values"""
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+def report(name: str, groups: Dict[str, range], key: int, samples: List[tuple]) -> List[float]:
+    """print the latencies of each group, return their p99"""
+    tails = []
+    for group, values in groups.items():
+        latencies = sorted(sample[2] for sample in samples if sample[key] in values)
+        if len(latencies) == 0:
+            continue
+        p50, p95, p99 = (percentile(latencies, q) for q in (0.5, 0.95, 0.99))
+        tails.append(p99)
+        print(f"{name:8} {group:7} {len(latencies):6} "
+              f"{p50 * 1000:7.2f} {p95 * 1000:7.2f} {p99 * 1000:7.2f} {latencies[-1] * 1000:7.2f}")
+    return tails
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="measure the turn latency of the bots over recorded frames")
+    parser.add_argument("bots", nargs="*", help="bots to measure, all by default")
+    parser.add_argument("-c", "--corpus", default=CORPUS,
+                        help="recorded frames, made on the first run")
+    parser.add_argument("-r", "--record", type=int, metavar="GAMES",
+                        help="record the corpus again over that many maps")
+    parser.add_argument("-t", "--search-time", type=float,
+                        help="seconds of search per frame, 0 for greedy play")
+    parser.add_argument("-f", "--fraction", type=float, default=0.5,
+                        help="fail when a p99 is above this fraction of the turn limit")
+    args = parser.parse_args()
+    for bot in args.bots:
+        if bot not in arena.BOTS:
+            parser.error(f"unknown bot {bot}, choose from {', '.join(arena.BOTS)}")
+    arena.silence()
+    if args.record is not None or not os.path.exists(args.corpus):
+        record(args.corpus, args.record or 4)
+    corpus = load(args.corpus)
+
+    tails = []
+    print(f"{'bot':8} {'group':7} {'frames':>6} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7} (ms)")
+    for bot in args.bots or arena.BOTS:
+        samples = replay(bot, corpus, args.search_time)
+        tails += report(bot, PHASES, 0, samples)
+        report(bot, DENSITIES, 1, samples)
+
+    if len(tails) == 0:
+        print("no frames to measure in the corpus", file=sys.stderr)
+        sys.exit(1)
+    limit = args.fraction * TURN_LIMIT
+    if max(tails) > limit:
+        print(f"p99 above {limit * 1000:.0f}ms", file=sys.stderr)
+        sys.exit(1)
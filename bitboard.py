@@ -0,0 +1,221 @@
+from typing import Iterable, Iterator, List, Tuple
+
+from zobrist import (CELL_COUNT, DAY, DORMANT, NUTRIENTS, OPP_IS_WAITING, OPP_SCORE, OPP_SUN,
+                     SCALAR_KEYS, SCORE, SUN, tree_key)
+
+# one bit per cell, cell i is the bit 1 << i
+# shadow queries take the ray masks of geometry.Geometry.rays
+# the trees and dormant masks must be changed through the methods, which keep
+# the zobrist hash of the trees up to date
+
+FULL = (1 << CELL_COUNT) - 1
+
+
+def popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+if hasattr(int, "bit_count"):  # python 3.10+, ten times faster
+    popcount = int.bit_count
+
+
+def bits(mask: int) -> Iterator[int]:
+    """indexes of the set bits, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def tree_price(tree_count: List[int], size: int) -> int:
+    return pow(2, size) - 1 + tree_count[size]
+
+
+class State:
+    __slots__ = ("day", "nutrients", "sun", "score", "opp_sun", "opp_score",
+                 "opp_is_waiting", "sizes", "mine", "opp", "dormant", "zobrist")
+
+    def __init__(self):
+        self.day = 0
+        self.nutrients = 0
+        self.sun = 0
+        self.score = 0
+        self.opp_sun = 0
+        self.opp_score = 0
+        self.opp_is_waiting = False
+        self.sizes = [0, 0, 0, 0]  # trees of each size
+        self.mine = 0
+        self.opp = 0
+        self.dormant = 0
+        self.zobrist = 0  # hash of the trees and dormant masks
+
+    @classmethod
+    def from_trees(cls, trees: Iterable[Tuple[int, int, bool, bool]]) -> "State":
+        """build from (cell, size, is_mine, is_dormant) rows"""
+        state = cls()
+        for cell, size, is_mine, is_dormant in trees:
+            state.place(cell, size, is_mine, is_dormant)
+        return state
+
+    def rows(self) -> Iterator[Tuple[int, int, int, int]]:
+        """(cell, size, is_mine, is_dormant) rows, as the protocol lists the trees"""
+        for cell in bits(self.mine | self.opp):
+            yield cell, self.size(cell), self.mine >> cell & 1, self.dormant >> cell & 1
+
+    def copy(self) -> "State":
+        other = State.__new__(State)
+        other.day = self.day
+        other.nutrients = self.nutrients
+        other.sun = self.sun
+        other.score = self.score
+        other.opp_sun = self.opp_sun
+        other.opp_score = self.opp_score
+        other.opp_is_waiting = self.opp_is_waiting
+        other.sizes = self.sizes[:]
+        other.mine = self.mine
+        other.opp = self.opp
+        other.dormant = self.dormant
+        other.zobrist = self.zobrist
+        return other
+
+    def key(self) -> tuple:
+        return (self.day, self.nutrients, self.sun, self.score, self.opp_sun,
+                self.opp_score, self.opp_is_waiting, *self.sizes, self.mine,
+                self.dormant)
+
+    def hash_key(self) -> int:
+        """64-bit zobrist hash of the whole state"""
+        mask = SCALAR_KEYS - 1
+        return (self.zobrist ^ DAY[self.day & 31] ^ NUTRIENTS[self.nutrients & 31] ^
+                SUN[self.sun & mask] ^ SCORE[self.score & mask] ^
+                OPP_SUN[self.opp_sun & mask] ^ OPP_SCORE[self.opp_score & mask] ^
+                OPP_IS_WAITING[self.opp_is_waiting])
+
+    def rehash(self):
+        """compute the hash of the trees again, after setting the masks directly"""
+        self.zobrist = 0
+        for cell in bits(self.trees):
+            self.zobrist ^= tree_key(cell, self.size(cell), self.mine >> cell & 1)
+        for cell in bits(self.dormant):
+            self.zobrist ^= DORMANT[cell]
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, State) and self.key() == other.key()
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+    def __repr__(self) -> str:
+        trees = " ".join(
+            f"{cell}:{'M' if self.mine >> cell & 1 else 'O'}{self.size(cell)}"
+            for cell in bits(self.trees))
+        return f"State(day={self.day}, sun={self.sun}, {trees})"
+
+    # TREES
+
+    @property
+    def trees(self) -> int:
+        return self.mine | self.opp
+
+    def owned(self, is_mine: bool) -> int:
+        return self.mine if is_mine else self.opp
+
+    def has_tree(self, cell: int) -> bool:
+        return (self.mine | self.opp) >> cell & 1 == 1
+
+    def size(self, cell: int) -> int:
+        """size of the tree on the cell, -1 if empty"""
+        bit = 1 << cell
+        for size in range(4):
+            if self.sizes[size] & bit:
+                return size
+        return -1
+
+    def is_mine(self, cell: int) -> bool:
+        return self.mine >> cell & 1 == 1
+
+    def is_dormant(self, cell: int) -> bool:
+        return self.dormant >> cell & 1 == 1
+
+    def place(self, cell: int, size: int, is_mine: bool, is_dormant: bool = False):
+        bit = 1 << cell
+        self.sizes[size] |= bit
+        if is_mine:
+            self.mine |= bit
+        else:
+            self.opp |= bit
+        self.zobrist ^= tree_key(cell, size, is_mine)
+        if is_dormant:
+            self.set_dormant(cell)
+
+    def remove(self, cell: int):
+        size = self.size(cell)
+        if size < 0:
+            return
+        self.zobrist ^= tree_key(cell, size, self.mine >> cell & 1)
+        if self.dormant >> cell & 1:
+            self.zobrist ^= DORMANT[cell]
+        clear = FULL ^ (1 << cell)
+        self.sizes = [mask & clear for mask in self.sizes]
+        self.mine &= clear
+        self.opp &= clear
+        self.dormant &= clear
+
+    def grow(self, cell: int):
+        bit = 1 << cell
+        size = self.size(cell)
+        is_mine = self.mine >> cell & 1
+        self.sizes[size] ^= bit
+        self.sizes[size + 1] |= bit
+        self.zobrist ^= tree_key(cell, size, is_mine) ^ tree_key(cell, size + 1, is_mine)
+
+    def set_dormant(self, cell: int):
+        if not self.dormant >> cell & 1:
+            self.dormant |= 1 << cell
+            self.zobrist ^= DORMANT[cell]
+
+    def wake(self):
+        """a new day, no tree is dormant anymore"""
+        for cell in bits(self.dormant):
+            self.zobrist ^= DORMANT[cell]
+        self.dormant = 0
+
+    def tree_count(self, is_mine: bool = True) -> List[int]:
+        owner = self.owned(is_mine)
+        return [popcount(mask & owner) for mask in self.sizes]
+
+    def grow_cost(self, size: int, is_mine: bool = True) -> int:
+        """price to grow a tree of the given size"""
+        return pow(2, size + 1) - 1 + popcount(self.sizes[size + 1] & self.owned(is_mine))
+
+    def seed_cost(self, is_mine: bool = True) -> int:
+        return popcount(self.sizes[0] & self.owned(is_mine))
+
+    # SHADOWS
+
+    def shade(self, rays: List[List[List[int]]], sun_dir: int) -> List[int]:
+        """shade[size] = cells under a shadow cast by a tree of at least that size"""
+        rays = rays[sun_dir]
+        shade3 = 0
+        for cell in bits(self.sizes[3]):
+            shade3 |= rays[cell][3]
+        shade2 = shade3
+        for cell in bits(self.sizes[2]):
+            shade2 |= rays[cell][2]
+        shade1 = shade2
+        for cell in bits(self.sizes[1]):
+            shade1 |= rays[cell][1]
+        return [shade1, shade1, shade2, shade3]
+
+    def shadowed(self, shade: List[int]) -> int:
+        """trees that are spooked by a shade and won't produce sun"""
+        return ((self.sizes[1] & shade[1]) | (self.sizes[2] & shade[2]) |
+                (self.sizes[3] & shade[3]))
+
+    def is_shadowed(self, rays: List[List[List[int]]], cell: int, day: int) -> bool:
+        """whether any shadow is cast on the cell on that day"""
+        return self.shade(rays, day % 6)[1] >> cell & 1 == 1
+
+    def sun_income(self, rays: List[List[List[int]]], day: int, is_mine: bool = True) -> int:
+        producing = self.owned(is_mine) & ~self.shadowed(self.shade(rays, day % 6))
+        return sum(size * popcount(self.sizes[size] & producing) for size in range(1, 4))
@@ -0,0 +1,102 @@
+import os
+import sys
+import argparse
+from collections import Counter
+from typing import List, Set, Tuple
+
+import arena
+from bitboard import State
+from opening import BOOK_PATH, OPENING_DAYS, canonical, format_entry, map_action
+from referee import Referee
+from simulation import Action, parse_action
+
+# evolution of the book moves, much longer than in a turn
+BOOK_TIME = 1.0
+BOOK_HORIZON = 5
+BOOK_POPULATION = 16
+# maps sampled to choose the book entries, far from the arena seeds so the
+# arena series play maps the book wasn't chosen on
+SAMPLE_SEED = 100000
+SAMPLE_MAPS = 20000
+
+
+def known_keys(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path) as book:
+        return {line.split(" ", 1)[0] for line in book if line.strip()}
+
+
+def map_key(seed: int) -> str:
+    """book key of the map of a seed, as the bots compute it on their first frame"""
+    referee = Referee(seed)
+    cells = range(len(referee.size))
+    state = State.from_trees((cell, referee.size[cell], referee.owner[cell] == 0, False)
+                             for cell in cells if referee.size[cell] >= 0)
+    return canonical(referee.board.neighbors, referee.board.richness, state)[0]
+
+
+def frequent_maps(seed: int, count: int) -> List[Tuple[str, int, int]]:
+    """(key, first seed, seeds) of the maps of `count` seeds from `seed`, the most frequent first
+
+    the map generator draws a few layouts much more often than the others,
+    so the book covers the most games with their entries.
+    """
+    seeds = Counter()
+    first = {}
+    for map_seed in range(seed, seed + count):
+        key = map_key(map_seed)
+        seeds[key] += 1
+        first.setdefault(key, map_seed)
+    return [(key, first[key], total) for key, total in seeds.most_common()]
+
+
+def opening(seed: int, search_time: float = BOOK_TIME) -> str:
+    """book line of a map: the long evolution plays the first days against the greedy bot"""
+    referee = Referee(seed)
+    init_lines = referee.board.lines()
+    player = arena.KaliozBot(init_lines, search_time)
+    player.forest.evolution.horizon = BOOK_HORIZON
+    player.forest.evolution.population = BOOK_POPULATION
+    opponent = arena.KaliozBot(init_lines, 0)
+    days: List[List[Action]] = [[] for _ in range(OPENING_DAYS)]
+    key, image = None, None
+    while referee.day < OPENING_DAYS:
+        actions = {}
+        if 0 in referee.active_players():
+            actions[0] = player.play(referee.frame_lines(0))
+            if key is None:
+                forest = player.forest
+                key, image = canonical(forest.geometry.neighbors, forest.simulator.richness, forest.state)
+            action = parse_action(actions[0])
+            if action[0] != "WAIT":
+                days[referee.day].append(map_action(action, image))
+        if 1 in referee.active_players():
+            actions[1] = opponent.play(referee.frame_lines(1))
+        referee.play(actions)
+    return format_entry(key, days)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="add the openings of generated maps to the book")
+    parser.add_argument("-n", "--maps", type=int, default=10,
+                        help="entries added, the most frequent maps missing from the book")
+    parser.add_argument("-s", "--seed", type=int, default=SAMPLE_SEED,
+                        help="first seed of the maps sampled")
+    parser.add_argument("--sample", type=int, default=SAMPLE_MAPS,
+                        help="seeds sampled to rank the maps by frequency")
+    parser.add_argument("-t", "--search-time", type=float, default=BOOK_TIME)
+    parser.add_argument("-o", "--output", default=BOOK_PATH)
+    args = parser.parse_args()
+    arena.silence()
+    keys = known_keys(args.output)
+    missing = [entry for entry in frequent_maps(args.seed, args.sample) if entry[0] not in keys]
+    for key, seed, seeds in missing[:args.maps]:
+        line = opening(seed, args.search_time)
+        if not line.startswith(key + " "):
+            raise RuntimeError(f"map {seed}: the bot computed another key than {key}")
+        keys.add(key)
+        with open(args.output, "a") as book:
+            book.write(line + "\n")
+        print(f"map {seed} ({seeds} of {args.sample} seeds): {line}", file=sys.stderr)
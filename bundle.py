@@ -0,0 +1,105 @@
+import os
+import re
+import ast
+import sys
+import argparse
+from typing import Dict, List, Set
+
+# CodinGame only takes a single file: inline the local modules a bot imports
+
+LOCAL_IMPORT = re.compile(r"^from (\w+) import .+$|^import (\w+)$")
+MAIN_GUARD = 'if __name__ == "__main__":'
+# data files embedded in place of a `NAME = None` line, the bot can't read files
+EMBEDDED = {"BOOK_TEXT": "opening.book"}
+
+
+def local_module(line: str, root: str) -> str:
+    match = LOCAL_IMPORT.match(line.strip())
+    if match is None or line[0].isspace():
+        return None
+    name = match.group(1) or match.group(2)
+    return name if os.path.isfile(os.path.join(root, f"{name}.py")) else None
+
+
+def embed(line: str, root: str) -> str:
+    name, _, value = line.partition(" = ")
+    data = os.path.join(root, EMBEDDED.get(name, ""))
+    if not value.startswith("None") or name not in EMBEDDED or not os.path.isfile(data):
+        return line
+    with open(data, encoding="utf-8") as source:
+        return f"{name} = {source.read()!r}"
+
+
+def definitions(code: str) -> List[str]:
+    """names a module binds at its top level, the local imports aside"""
+    names = []
+    nodes = ast.parse(code).body
+    for node in nodes:
+        if isinstance(node, (ast.If, ast.Try)):
+            nodes += node.body + node.orelse  # a definition under a version check
+        elif isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            names.append(node.name)
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                elements = target.elts if isinstance(target, ast.Tuple) else [target]
+                names += [element.id for element in elements if isinstance(element, ast.Name)]
+    return names
+
+
+def inline(path: str, done: Set[str], keep_main: bool, defined: Dict[str, str]) -> List[str]:
+    """the lines of the module, its local imports inlined
+
+    the modules share one namespace once bundled, so a name bound by two of
+    them is refused: the last one would silently replace the other.
+    """
+    root = os.path.dirname(os.path.abspath(path))
+    with open(path, encoding="utf-8") as source:
+        code = source.read()
+    module = os.path.basename(path)
+    for name in definitions(code):
+        if defined.setdefault(name, module) != module:
+            raise ValueError(f"{name} is defined in both {defined[name]} and {module}, "
+                             "rename one of them")
+    lines = code.splitlines()
+    output = []
+    continued = False  # inside the parentheses of a local import
+    for line in lines:
+        if not keep_main and line.startswith(MAIN_GUARD):
+            break
+        if continued:
+            continued = ")" not in line
+            continue
+        name = local_module(line, root)
+        if name is not None:
+            continued = "(" in line and ")" not in line
+        if name is None:
+            output.append(embed(line, root))
+        elif name not in done:
+            done.add(name)
+            output += [f"# ==== {name}.py ===="]
+            output += inline(os.path.join(root, f"{name}.py"), done, False, defined)
+            output += [f"# ==== end of {name}.py ===="]
+    return output
+
+
+def bundle(path: str) -> str:
+    name = os.path.splitext(os.path.basename(path))[0]
+    return "\n".join(inline(path, {name}, True, {})) + "\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="bundle a bot and its local modules into one file")
+    parser.add_argument("bot")
+    parser.add_argument("-o", "--output")
+    args = parser.parse_args()
+    try:
+        code = bundle(args.bot)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(code)
+    else:
+        sys.stdout.write(code)
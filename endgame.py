@@ -0,0 +1,85 @@
+import time
+from typing import Optional
+
+from bitboard import State, popcount
+from simulation import MAX_DAY, WAIT, Action, Simulator
+from transposition import TranspositionTable
+
+ENDGAME_DAYS = 4  # last days the solver can take over
+NODE_BUDGET = 1000  # estimated size of the searches started, ~40ms
+
+
+class Timeout(Exception):
+    pass
+
+
+class Endgame:
+    """exact search over our actions until the end of the game
+
+    the opponent is taken as asleep, its trees casting their shadows as
+    they are. the value of a state is the final score and sun we can still
+    reach from it, as 3 * score + sun so that a sun left over breaks the
+    ties of score + sun // 3. states reached in different orders share their
+    value through a transposition table.
+    """
+
+    def __init__(self, simulator: Simulator, budget: int = NODE_BUDGET,
+                 table: Optional[TranspositionTable] = None):
+        self.simulator = simulator
+        self.budget = budget
+        self.table = table if table is not None else TranspositionTable(1 << 20)
+        self.deadline = 0.0
+        self.nodes = 0
+
+    def estimate(self, state: State) -> int:
+        """rough size of the exact search, fitted on recorded endgames"""
+        days = MAX_DAY - state.day + 1
+        return (popcount(state.mine) + 1) ** days * (state.sun // 4 + 1)
+
+    def applies(self, state: State) -> bool:
+        return state.day > MAX_DAY - ENDGAME_DAYS and self.estimate(state) <= self.budget
+
+    def actions(self, state: State):
+        """our actions that can still pay off, as a completion or as sun income"""
+        days_left = MAX_DAY - state.day
+        for action in self.simulator.actions(state):
+            if action[0] == "GROW":
+                size = state.size(action[1])
+                if size + days_left < 3 and state.grow_cost(size) >= days_left:
+                    continue
+            elif action[0] == "SEED":
+                if days_left < 4 and state.seed_cost() + 1 >= days_left - 1:
+                    continue
+            yield action
+
+    def value(self, state: State) -> int:
+        if state.day > MAX_DAY:
+            return 3 * state.score + state.sun
+        key = state.hash_key()
+        entry = self.table.get(key)
+        if entry is not None:
+            return int(entry[0])
+        self.nodes += 1
+        if self.nodes & 63 == 0 and time.perf_counter() > self.deadline:
+            raise Timeout
+        best, best_action = -1, WAIT
+        for action in self.actions(state):
+            if action[0] == "WAIT":
+                value = self.value(self.simulator.end_day(state))
+            else:
+                value = self.value(self.simulator.play(state, action))
+            if value > best:
+                best, best_action = value, action
+        self.table.put(key, MAX_DAY - state.day, best, best_action)
+        return best
+
+    def best_action(self, state: State, deadline: float) -> Optional[Action]:
+        """best action for the rest of the game, None if it took longer than the deadline"""
+        self.deadline = deadline
+        self.nodes = 0
+        self.table.new_search()
+        try:
+            self.value(state)
+        except Timeout:
+            return None
+        return self.table.get(state.hash_key())[1]
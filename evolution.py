@@ -0,0 +1,213 @@
+import os
+import time
+import random
+from typing import Callable, List, Optional, Tuple
+
+from bitboard import State
+from endgame import Endgame
+from rollout import Playout, Rollout
+from simulation import MAX_DAY, WAIT, Action, Simulator
+
+HORIZON = 3  # days of the plans, the current one included
+POPULATION = 8  # plans kept between the generations
+MAX_PLAN_ACTIONS = 8  # actions of a day of a plan
+CROSSOVER = 0.3  # part of the children mixing the days of two parents
+OPPONENT_SEED = 0  # the opponent model breaks its ties the same way for every plan
+PONDER_TIME = 0.1  # longest pondering after a frame, the CPU may be shared with the referee
+
+# our actions of each day, the policy playing after the last one unless it is a WAIT
+Plan = List[List[Optional[Action]]]
+
+
+class Evolution:
+    """rolling horizon evolution of our actions over the next days
+
+    a plan is evaluated by playing it on a playout, the greedy policy of
+    the rollouts finishing the days it doesn't end with a WAIT and the
+    opponent playing that policy every day, then the simulator evaluates
+    the state reached. our whole day is played before the opponent moves,
+    so the opponent model sees our moves of the day, as in the rollouts
+    where the moves of a day are played in turn. the actions that became
+    illegal are skipped, so children only need a mutation point: one
+    action of a day is replaced by a random legal one, or a random one
+    inserted there. the random of the playouts is reseeded before each
+    evaluation, so the policies play the same way for every plan, while
+    the mutations are drawn from the random of the evolution.
+
+    the plan of the fallback action (the greedy one of the bot) is the
+    first evaluated and is only replaced by a better one, and the best plan
+    is carried over to the next frame, its played action removed. while
+    the next input is awaited, the plans of the expected next state are
+    evolved, then kept if that state comes. in the last days, the endgame
+    solver plays instead when its search looks small enough.
+    """
+
+    def __init__(self, simulator: Simulator, horizon: int = HORIZON, population: int = POPULATION,
+                 endgame: Optional[Endgame] = None, seed: Optional[int] = None):
+        self.simulator = simulator
+        self.endgame = endgame
+        self.horizon = horizon
+        self.population = population
+        self.random = random.Random(seed)
+        self.rollout = Rollout(simulator, epsilon=0, seed=seed)
+        self.plan: Plan = []  # best plan of the last frame, from its day
+        self.day = -1
+        self.pondered: Optional[Tuple[int, List[Tuple[float, Plan]]]] = None  # (state key, plans)
+        self.evaluations = 0
+        self.reused = 0  # frames starting from the pondered plans
+
+    def best_action(self, state: State, deadline: float, fallback: Action = WAIT) -> Action:
+        """first action of the best plan evolved before the deadline (a time.perf_counter value)"""
+        self.evaluations = 0
+        pondered, self.pondered = self.pondered, None
+        if self.endgame is not None and self.endgame.applies(state):
+            action = self.endgame.best_action(state, deadline)
+            if action is not None:
+                self.plan = []
+                return action
+        population = [self.evaluate(state, [[fallback]])]
+        baseline = population[0]
+        if pondered is not None and pondered[0] == state.hash_key():
+            population += pondered[1]
+            self.reused += 1
+        else:
+            carried = self.carried(state)
+            if carried is not None and time.perf_counter() < deadline:
+                population.append(self.evaluate(state, carried))
+        self.evolve(state, population, lambda: time.perf_counter() >= deadline)
+        value, plan = max(population, key=lambda individual: individual[0])
+        action = plan[0][0]
+        if value <= baseline[0] or not self.simulator.is_legal(state, action):
+            plan, action = baseline[1], fallback
+        if action == WAIT:
+            self.plan, self.day = plan[1:], state.day + 1
+        else:
+            self.plan, self.day = [plan[0][1:]] + plan[1:], state.day
+        return action
+
+    def ponder(self, state: State, action: Action, ready: Callable[[], bool]):
+        """evolve the plans of the state expected after our action until the next input is ready
+
+        the plans are kept for the next frame, used when its state is the
+        expected one. the input is looked for before each step, so it
+        waits one evaluation at most, and the CPU is yielded between them
+        to the process writing it.
+        """
+        self.pondered = None
+        deadline = time.perf_counter() + PONDER_TIME
+
+        def done() -> bool:
+            if hasattr(os, "sched_yield"):
+                os.sched_yield()
+            return ready() or time.perf_counter() > deadline
+
+        if done():
+            return
+        expected = self.expected(state, action)
+        if expected is None or done():
+            return
+        if self.endgame is not None and self.endgame.applies(expected):
+            return
+        if done():
+            return
+        carried = self.carried(expected)
+        population = [self.evaluate(expected, carried if carried is not None else [])]
+        self.pondered = (expected.hash_key(), population)
+        self.evolve(expected, population, done)
+
+    def expected(self, state: State, action: Action) -> Optional[State]:
+        """state of our next frame if the opponent plays as modelled, None after the last day"""
+        rollout = self.rollout
+        rollout.random.seed(OPPONENT_SEED)
+        playout = Playout.from_state(state)
+        if action[0] != "WAIT":
+            rollout.apply(playout, 1, action)
+            if not playout.waiting[0]:
+                opponent = rollout.greedy(playout, 0)
+                if opponent[0] == "WAIT":
+                    playout.waiting[0] = True
+                else:
+                    rollout.apply(playout, 0, opponent)
+            return playout.to_state()
+        if not playout.waiting[0]:
+            rollout.play_day(playout, 0)
+        rollout.end_day(playout)
+        return playout.to_state() if playout.day <= MAX_DAY else None
+
+    def evolve(self, state: State, population: List[Tuple[float, Plan]], done: Callable[[], bool]):
+        """add children to the population until done, the best ones kept"""
+        while not done():
+            population.sort(key=lambda individual: individual[0], reverse=True)
+            del population[self.population:]
+            population.append(self.evaluate(state, self.child(population)))
+
+    def carried(self, state: State) -> Optional[Plan]:
+        """the best plan of the last frame, without the days gone by"""
+        if not self.plan or self.day > state.day:
+            return None
+        plan = self.plan[state.day - self.day:]
+        return plan if plan else None
+
+    def child(self, population: List[Tuple[float, Plan]]) -> Plan:
+        """a mutated copy of a plan drawn by tournament, mixed with another one at times"""
+        parent = self.tournament(population)
+        plan = [day[:] for day in parent]
+        if self.horizon > 1 and len(population) > 1 and self.random.random() < CROSSOVER:
+            other = self.tournament(population)
+            cut = self.random.randrange(1, self.horizon)
+            plan = plan[:cut] + [day[:] for day in other[cut:]]
+        if not plan:
+            plan.append([])
+        actions = plan[self.random.randrange(len(plan))]
+        # the mutation is drawn among the legal actions when the playout reaches it,
+        # before the WAIT ending the day
+        index = self.random.randrange(len(actions)) if actions else 0
+        if index < len(actions) and self.random.random() < 0.5:
+            actions[index] = None
+        else:
+            actions.insert(index, None)
+        return plan
+
+    def tournament(self, population: List[Tuple[float, Plan]]) -> Plan:
+        first, second = self.random.sample(population, 2) if len(population) > 1 else population * 2
+        return first[1] if first[0] >= second[0] else second[1]
+
+    def evaluate(self, state: State, plan: Plan) -> Tuple[float, Plan]:
+        """value of the plan and the actions it really played, the days after it played greedily"""
+        rollout = self.rollout
+        rollout.random.seed(OPPONENT_SEED)
+        playout = Playout.from_state(state)
+        played: Plan = []
+        for day in range(self.horizon):
+            actions = plan[day] if day < len(plan) else []
+            played.append(self.play_day(playout, actions))
+            if not playout.waiting[0]:
+                rollout.play_day(playout, 0)
+            rollout.end_day(playout)
+            if playout.day > MAX_DAY:
+                break
+        self.evaluations += 1
+        return self.simulator.evaluate(playout.to_state()), played
+
+    def play_day(self, playout: Playout, actions: List[Optional[Action]]) -> List[Action]:
+        """our legal actions of the day then the policy until it waits, the actions played"""
+        rollout = self.rollout
+        played = []
+        index = 0
+        while len(played) < MAX_PLAN_ACTIONS:
+            if index < len(actions):
+                action = actions[index]
+                index += 1
+                if action is None:
+                    action = rollout.sample(playout, 1, self.random)
+                elif not rollout.is_legal(playout, 1, action):
+                    continue
+            else:
+                action = rollout.greedy(playout, 1)
+            if action[0] == "WAIT":
+                break
+            rollout.apply(playout, 1, action)
+            played.append(action)
+        played.append(WAIT)
+        playout.waiting[1] = True
+        return played
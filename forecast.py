@@ -0,0 +1,97 @@
+from typing import List, Tuple
+
+from bitboard import State, bits
+from geometry import Geometry
+from hooks import hook
+from simulation import MAX_DAY
+
+FORECAST_DAYS = 3
+
+
+def forecast_directions(day: int, days: int = FORECAST_DAYS) -> List[int]:
+    """sun directions of the days after `day` a forecast covers, up to the end of the game"""
+    return [(day + delta) % 6 for delta in range(1, min(days, MAX_DAY - day) + 1)]
+
+
+class Forecast:
+    """sun income of every tree over the next days, the trees staying as they are
+
+    strength[day][cell] is the size of the biggest tree shadowing the cell
+    on that day of the forecast, a tree being spooked when it is not bigger.
+    changing the size of one tree only touches the cells of its shadows.
+    """
+
+    def __init__(self, geometry: Geometry, days: int = FORECAST_DAYS):
+        self.geometry = geometry
+        self.days = days
+        count = geometry.cell_count
+        self.sizes = [-1] * count
+        self.mine = [False] * count
+        self.directions: List[int] = []
+        self.strength: List[List[int]] = []
+        self.totals = [0, 0]  # sun of (the opponent, us) over the days
+
+    def reset(self, state: State, day: int):
+        """forecast the days after `day`, up to the end of the game"""
+        count = self.geometry.cell_count
+        self.sizes = [-1] * count
+        self.mine = [False] * count
+        for size in range(4):
+            for cell in bits(state.sizes[size]):
+                self.sizes[cell] = size
+                self.mine[cell] = state.mine >> cell & 1 == 1
+        self.directions = forecast_directions(day, self.days)
+        shadows = self.geometry.shadows
+        self.strength = [[0] * count for _ in self.directions]
+        for index, sun_dir in enumerate(self.directions):
+            strength = self.strength[index]
+            for cell, size in enumerate(self.sizes):
+                if size > 0:
+                    for target in shadows[(cell * 6 + sun_dir) * 4 + size]:
+                        if strength[target] < size:
+                            strength[target] = size
+        self.totals = [0, 0]
+        for cell, size in enumerate(self.sizes):
+            if size > 0:
+                self.totals[self.mine[cell]] += self.tree_income(cell)
+
+    def tree_income(self, cell: int) -> int:
+        """sun the tree on the cell gathers over the days"""
+        size = self.sizes[cell]
+        if size <= 0:
+            return 0
+        return sum(size for strength in self.strength if strength[cell] < size)
+
+    @hook
+    def delta(self, cell: int, size: int, is_mine: bool = True) -> Tuple[int, int]:
+        """change of (our, the opponent) sun if the tree on the cell had that size, -1 for none
+
+        nothing is changed, only the trees in the shadows of the cell are looked at
+        """
+        diff = [0, 0]
+        sizes = self.sizes
+        mine = self.mine
+        shadows = self.geometry.shadows
+        old = sizes[cell]
+        reach = max(old, size, 0)
+        for index, sun_dir in enumerate(self.directions):
+            current = self.strength[index]
+            if current[cell] < old:
+                diff[mine[cell]] -= old
+            if current[cell] < size:
+                diff[is_mine] += size
+            back = (sun_dir + 3) % 6
+            for target in shadows[(cell * 6 + sun_dir) * 4 + reach]:
+                target_size = sizes[target]
+                if target_size <= 0:
+                    continue
+                # the tree is spooked by any source of at least its size in reach
+                after = True
+                for distance, source in enumerate(shadows[(target * 6 + back) * 4 + 3], 1):
+                    source_size = size if source == cell else sizes[source]
+                    if source_size >= distance and source_size >= target_size:
+                        after = False
+                        break
+                if (current[target] < target_size) != after:
+                    diff[mine[target]] += target_size if after else -target_size
+        return diff[1], diff[0]
@@ -0,0 +1,78 @@
+from array import array
+from typing import List, Tuple
+
+# static lookup tables of the map, computed once from the neighbors lists
+
+MAX_SIZE = 3
+
+
+class Geometry:
+    def __init__(self, neighbors: List[List[int]]):
+        self.neighbors = [list(cell_neighbors) for cell_neighbors in neighbors]
+        self.cell_count = len(self.neighbors)
+
+        # shadow[(cell * 6 + sun_dir) * 3 + distance - 1] = shadowed cell, -1 out of the map
+        self.shadow = [-1] * (self.cell_count * 6 * MAX_SIZE)
+        # shadows[(cell * 6 + sun_dir) * 4 + size] = cells shadowed by a tree of that size
+        self.shadows: List[Tuple[int, ...]] = [()] * (self.cell_count * 6 * 4)
+        # rays[sun_dir][cell][size] = same as shadows, as a bitmask
+        self.rays = [[[0] * 4 for _ in range(self.cell_count)] for _ in range(6)]
+        for cell in range(self.cell_count):
+            for sun_dir in range(6):
+                base = cell * 6 + sun_dir
+                target = self.neighbors[cell][sun_dir]
+                distance = 0
+                while target >= 0 and distance < MAX_SIZE:
+                    self.shadow[base * MAX_SIZE + distance] = target
+                    distance += 1
+                    target = self.neighbors[target][sun_dir]
+                shadowed = tuple(self.shadow[base * MAX_SIZE:base * MAX_SIZE + distance])
+                for size in range(4):
+                    self.shadows[base * 4 + size] = shadowed[:size]
+                    self.rays[sun_dir][cell][size] = sum(1 << other for other in shadowed[:size])
+
+        # distances[cell * cell_count + other] = steps between the cells, by a BFS from each cell
+        self.distances = array("b", [-1]) * (self.cell_count * self.cell_count)
+        for cell in range(self.cell_count):
+            row = cell * self.cell_count
+            self.distances[row + cell] = 0
+            queue = [cell]
+            for current in queue:
+                for neighbor in self.neighbors[current]:
+                    if neighbor >= 0 and self.distances[row + neighbor] < 0:
+                        self.distances[row + neighbor] = self.distances[row + current] + 1
+                        queue.append(neighbor)
+
+        # rings[cell * 4 + distance] = cells at exactly that distance
+        # ranges[cell * 4 + distance] = cells at 1 up to that distance
+        self.rings: List[Tuple[int, ...]] = [()] * (self.cell_count * 4)
+        self.ranges: List[Tuple[int, ...]] = [()] * (self.cell_count * 4)
+        for cell in range(self.cell_count):
+            row = self.distances[cell * self.cell_count:(cell + 1) * self.cell_count]
+            for distance in range(MAX_SIZE + 1):
+                self.rings[cell * 4 + distance] = tuple(
+                    other for other, steps in enumerate(row) if steps == distance)
+                if distance > 0:
+                    self.ranges[cell * 4 + distance] = self.ranges[cell * 4 + distance - 1] + \
+                        self.rings[cell * 4 + distance]
+        # ring_masks and range_masks, same as rings and ranges as bitmasks
+        self.ring_masks = [sum(1 << other for other in cells) for cells in self.rings]
+        self.range_masks = [sum(1 << other for other in cells) for cells in self.ranges]
+
+    def distance(self, cell: int, other: int) -> int:
+        return self.distances[cell * self.cell_count + other]
+
+    def shadowed_cells(self, cell: int, sun_dir: int, size: int = MAX_SIZE) -> Tuple[int, ...]:
+        """cells shadowed by a tree of `size` on `cell`, closest first"""
+        return self.shadows[(cell * 6 + sun_dir) * 4 + size]
+
+    def shadow_sources(self, cell: int, sun_dir: int, size: int = MAX_SIZE) -> Tuple[int, ...]:
+        """cells from where a tree of `size` could shadow `cell`, closest first"""
+        return self.shadows[(cell * 6 + (sun_dir + 3) % 6) * 4 + size]
+
+    def ring(self, cell: int, distance: int) -> Tuple[int, ...]:
+        return self.rings[cell * 4 + distance]
+
+    def in_range(self, cell: int, distance: int) -> Tuple[int, ...]:
+        """cells that a tree of size `distance` can seed"""
+        return self.ranges[cell * 4 + distance]
@@ -0,0 +1,72 @@
+import sys
+import time
+import functools
+from typing import Callable, Dict, List, TextIO, Tuple
+
+# (class, attribute, function) of every hooked method
+REGISTRY: List[Tuple[type, str, Callable]] = []
+# name -> [calls, total seconds, max seconds] since the last report, for the whole
+# process: the calls of the scratch games a bot plays its policy in are counted with
+# its own, and in the arena the two bots share the numbers of the classes they share
+STATS: Dict[str, List[float]] = {}
+ENABLED = False
+
+
+class hook:
+    """marks a method to be counted and timed once the hooks are enabled
+
+    the method is left untouched until enable_hooks() is called, so a disabled
+    hook costs nothing.
+    """
+
+    def __init__(self, function: Callable):
+        self.function = function
+
+    def __set_name__(self, owner: type, name: str):
+        REGISTRY.append((owner, name, self.function))
+        setattr(owner, name, self.function)
+
+
+def timed(function: Callable, stats: List[float]) -> Callable:
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            stats[0] += 1
+            stats[1] += elapsed
+            if elapsed > stats[2]:
+                stats[2] = elapsed
+
+    return wrapper
+
+
+def enable_hooks():
+    global ENABLED
+    for owner, name, function in REGISTRY:
+        stats = STATS.setdefault(f"{owner.__name__}.{name}", [0, 0.0, 0.0])
+        setattr(owner, name, timed(function, stats))
+    ENABLED = True
+
+
+def disable_hooks():
+    global ENABLED
+    for owner, name, function in REGISTRY:
+        setattr(owner, name, function)
+    STATS.clear()
+    ENABLED = False
+
+
+def report_hooks(stream: TextIO = None):
+    """write the numbers of the process since the last report on one line, then reset them"""
+    if not ENABLED:
+        return
+    fields = []
+    for name, stats in STATS.items():
+        if stats[0] > 0:
+            fields.append(f"{name} {stats[0]}x {stats[1] * 1000:.2f}/{stats[2] * 1000:.2f}ms")
+            stats[:] = [0, 0.0, 0.0]
+    line = " | ".join(["hooks", *fields])
+    print(line, file=stream if stream is not None else sys.stderr)
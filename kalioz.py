@@ -1,18 +1,97 @@
-import sys
 import math
-import itertools
+import time
 
+from array import array
 from dataclasses import dataclass
 
-def debug(*args):
-  print(*args, file=sys.stderr)
+from endgame import Endgame
+from evolution import Evolution
+from forecast import Forecast
+from geometry import Geometry
+from hooks import enable_hooks, hook, report_hooks
+from log import TURN_BUDGET, Log
+from memo import Memo, memoize
+from moves import LegalMoves
+from opening import USE_BOOK, Opening
+from planner import PLAN_TIME, DayPlanner
+from protocol import Reader
+from shadowmap import ShadowMap
+from simulation import Simulator, format_action, parse_action
+from tracker import Tracker
+
+SEARCH_TIME = 0.04 # seconds of the turn given to the search, 0 to only play the greedy action
+HOOKS = False # count and time the scoring functions, one stderr line per turn
+
+LOG = Log()
+
+@dataclass
+class Parameters:
+  """strategy constants, tuned by tune.py"""
+  max_seeds: int = 2 # maximum number of seeds
+  max_level_3: int = 7 # maximum number of size:3 tree
+  min_level_3: int = 3 # minimum number of size:3 tree (before the last day)
+  max_trees: int = 9 # maximum number of trees allowed - the map can have 8 trees without having shadows, more and we would start having problems.
+  producer_trees_number: int = 2 # number of trees that should NOT be impacted by a single shadow
+  # weights of _case_get_seed_value
+  seed_shadow_impact: float = 2 # shadow cast by the future tree
+  seed_ombrage: float = 1 # shadow received by the future tree
+  seed_unshadowed: float = 1 # bonus of a case without any shadow
+  seed_prefer_unshadowed: float = 2 # added to this bonus when we lack unshadowed trees
+  seed_neighbor_richness: float = 1 # rich neighbor cases
+  seed_opp_neighbor: float = 1 # opponent trees next to the case
+  seed_own_neighbor: float = 1 # our trees next to the case
+
+# (min, max) explored by the tuner, integer bounds for integer parameters
+PARAMETER_RANGES = {
+  "max_seeds": (1, 4),
+  "max_level_3": (3, 10),
+  "min_level_3": (0, 6),
+  "max_trees": (5, 14),
+  "producer_trees_number": (0, 5),
+  "seed_shadow_impact": (0.0, 4.0),
+  "seed_ombrage": (0.0, 3.0),
+  "seed_unshadowed": (0.0, 3.0),
+  "seed_prefer_unshadowed": (0.0, 4.0),
+  "seed_neighbor_richness": (0.0, 3.0),
+  "seed_opp_neighbor": (0.0, 3.0),
+  "seed_own_neighbor": (0.0, 3.0),
+}
+
+def insert_tree(trees, tree):
+  """insert a tree, keeping the list ordered by cell"""
+  index = 0
+  while index < len(trees) and trees[index].cell_index < tree.cell_index:
+    index+=1
+  trees.insert(index, tree)
 
 class Forest:
-  def __init__(self):
-    number_of_cells = int(input())  # 37
-    self.cells = [Cell(input().split()) for i in range(number_of_cells)]
+  def __init__(self, cell_rows = None, reader = None, params = None):
+    self.params = params if params is not None else Parameters()
+    self.reader = reader if reader is not None else Reader()
+    if cell_rows is None:
+      cell_rows = self.reader.read_cells()
+    number_of_cells = len(cell_rows)  # 37
+    self.cell_rows = cell_rows
+    self.cells = [Cell(row) for row in cell_rows]
+    self.geometry = Geometry([cell.neighbors_id for cell in self.cells])
+    self.shadow_map = ShadowMap(self.geometry)
+    self.forecast = Forecast(self.geometry)
+    self.shadow_ratios = [0] * number_of_cells
     self._calculate_cell_neighbors()
 
+    self.simulator = Simulator(self.geometry, [cell.richness for cell in self.cells])
+    self.evolution = Evolution(self.simulator, endgame=Endgame(self.simulator))
+    self.planner = DayPlanner(self.simulator, self.policy)
+    self.search_time = SEARCH_TIME
+    self.scratch = None # forest used to evaluate simulated states
+    self.frame = None
+    self.legal = LegalMoves() # legal actions of the frame
+    self.frame_start = 0
+    self.replay = None # replay.Writer recording each turn
+    self.opening = None # book moves of this map
+    self.book_loaded = False
+    self.use_book = USE_BOOK
+
     self.day_max = 23
     self.day = 0
 
@@ -26,6 +105,9 @@ class Forest:
     self.opp_is_waiting = False
 
     self.trees = []
+    self.tracker = Tracker(number_of_cells)
+    self.memo = Memo(self.tracker)
+    self.state = self.tracker.state
     self.tree_by_cell_id = {}
     self.trees_mine = []
     self.trees_mine_active = []
@@ -33,134 +115,121 @@ class Forest:
     self.trees_mine_by_size = {i:[] for i in range(0,4)}
     self.trees_opp_by_size = {i:[] for i in range(0,4)}
 
-    self.max_seeds = 2 # maximum number of seeds
-    self.max_level_3 = 7 # maximum number of size:3 tree
-    self.min_level_3 = 3 # minimum number of size:3 tree (before the last day)
-    self.max_trees = 9 # maximum number of trees allowed - the map can have 8 trees without having shadows, more and we would start having problems.
-    self.producer_trees_number = 2 # number of trees that should NOT be impacted by a single shadow
+    self.max_seeds = self.params.max_seeds
+    self.max_level_3 = self.params.max_level_3
+    self.min_level_3 = self.params.min_level_3
+    self.max_trees = self.params.max_trees
+    self.producer_trees_number = self.params.producer_trees_number
 
   def read_inputs_loop(self):
-    self.day = int(input())  # the game lasts 24 days: 0-5
-    self.nutrients = int(input())  # the base score you gain from the next COMPLETE action
+    self.frame = self.reader.read_frame()
+    self.frame_start = time.perf_counter()
+    self.legal = LegalMoves.parse(self.frame.raw_moves)
+    self.day = self.frame.day  # the game lasts 24 days: 0-5
+    self.nutrients = self.frame.nutrients  # the base score you gain from the next COMPLETE action
     # sun: your sun points
     # score: your current score
-    self.sun, self.score = [int(i) for i in input().split()]
-    inputs = input().split()
+    self.sun, self.score = self.frame.sun, self.frame.score
     
-    self.opp_sun = int(inputs[0])  # opponent's sun points
-    self.opp_score = int(inputs[1])  # opponent's score
-    self.opp_is_waiting = inputs[2] != "0"  # whether your opponent is asleep until the next day
+    self.opp_sun = self.frame.opp_sun  # opponent's sun points
+    self.opp_score = self.frame.opp_score  # opponent's score
+    self.opp_is_waiting = self.frame.opp_is_waiting  # whether your opponent is asleep until the next day
     
-    number_of_trees = int(input())  # the current amount of trees
-    self.trees = [Tree(self.cells, input().split()) for i in range(number_of_trees)]
-
-    number_of_possible_moves = int(input())
-    possible_moves = [input() for i in range(number_of_possible_moves)]
+    changed = self.tracker.update(self.day, self.frame.trees)
 
     # post input treatment
-    self._calculate_trees()
+    self._calculate_trees(changed)
   
-  def _calculate_trees(self):
-    self.tree_by_cell_id = {}
-    self.trees_mine = []
-    self.trees_mine_active = []
-    self.trees_opp = []
-    self.trees_mine_by_size = {i:[] for i in range(0,4)}
-    self.trees_opp_by_size = {i:[] for i in range(0,4)}
-    for tree in self.trees: # single loop to improve performance
-      self.tree_by_cell_id[tree.cell.index] = tree
-      if tree.is_mine:
-        self.trees_mine.append(tree)
-        self.trees_mine_by_size[tree.size].append(tree)
-        if not tree.is_dormant:
-          self.trees_mine_active.append(tree)
-      else:
-        self.trees_opp.append(tree)
-        self.trees_opp_by_size[tree.size].append(tree)
+  def load_state(self, state):
+    """replace the inputs by a simulated state"""
+    self.day = state.day
+    self.nutrients = state.nutrients
+    self.sun, self.score = state.sun, state.score
+    self.opp_sun, self.opp_score = state.opp_sun, state.opp_score
+    self.opp_is_waiting = state.opp_is_waiting
+    self.legal = LegalMoves.generate(self.simulator, state)
+    self._calculate_trees(self.tracker.update(self.day, state.rows()))
+
+  def _calculate_trees(self, changed):
+    """update the trees of the cells that changed since the last frame"""
+    for cell_index in changed:
+      if cell_index in self.tree_by_cell_id:
+        self._remove_tree(self.tree_by_cell_id.pop(cell_index))
+      row = self.tracker.rows[cell_index]
+      if row is not None:
+        tree = Tree(self.cells, row)
+        self.tree_by_cell_id[cell_index] = tree
+        self._add_tree(tree)
+
+    self.state = self.tracker.state
+    self.state.day = self.day
+    self.state.nutrients = self.nutrients
+    self.state.sun, self.state.score = self.sun, self.score
+    self.state.opp_sun, self.state.opp_score = self.opp_sun, self.opp_score
+    self.state.opp_is_waiting = self.opp_is_waiting
     
+    # calculate shadows once for the whole frame
+    self.shadow_map.update(self.state)
+    self.shadow_ratios = ((self.shadow_map.forecast(self.day) > 0).sum(axis=0) / 6).tolist()
+    self.forecast.reset(self.state, self.day)
+
     # calculate shadow ratio for each one of my trees
     for tree in self.trees_mine:
       tree.shadow_ratio = self.cell_ratio_shadow(tree.cell, self.day)
 
+  def _add_tree(self, tree):
+    insert_tree(self.trees, tree)
+    if tree.is_mine:
+      insert_tree(self.trees_mine, tree)
+      insert_tree(self.trees_mine_by_size[tree.size], tree)
+      if not tree.is_dormant:
+        insert_tree(self.trees_mine_active, tree)
+    else:
+      insert_tree(self.trees_opp, tree)
+      insert_tree(self.trees_opp_by_size[tree.size], tree)
+
+  def _remove_tree(self, tree):
+    self.trees.remove(tree)
+    if tree.is_mine:
+      self.trees_mine.remove(tree)
+      self.trees_mine_by_size[tree.size].remove(tree)
+      if not tree.is_dormant:
+        self.trees_mine_active.remove(tree)
+    else:
+      self.trees_opp.remove(tree)
+      self.trees_opp_by_size[tree.size].remove(tree)
+
   def _calculate_cell_neighbors(self):
     # change cells id to cells pointer
     for cell in self.cells:
-      cell.neighbors = [self.cells[i] if i != -1 else None for i in cell.neighbors_id ]
-    
-    # calculate cells distance
-    for cell in self.cells:
-      neighbors = self.__calculate_cell_neighbors_recursive(cell)
-      cell.neighbors_by_size = {i:[self.cells[cell_j] for cell_j in neighbors if neighbors[cell_j] == i] for i in range(1,4)}
-      if len(cell.neighbors_by_size[1])>6 or len(cell.neighbors_by_size[2])>12 or len(cell.neighbors_by_size[3])>18:
-        debug("ERROR calculate cell neighbors", cell, cell.neighbors_by_size)
-
-  def __calculate_cell_neighbors_recursive(self, cell, output = None, distance=1, max_distance=3):
-    """recursively calculate the distance. return {case_id: distance}"""
-    if max_distance - distance < 0:
-      return output
-
-    if output is None:
-      output = {}
-      output[cell.index] = 0
-
-    for cell_n in cell.neighbors:
-      if cell_n is None:
-        continue
-      if cell_n.index not in output or output[cell_n.index] > distance:
-        output[cell_n.index] = distance
-        if distance + 1 <= max_distance:
-            self.__calculate_cell_neighbors_recursive(cell_n, output, distance +1, max_distance)
-    
-    return output
+      cell.neighbors = tuple(self.cells[i] if i != -1 else None for i in cell.neighbors_id)
 
+    # cells impacted by a shadow, same layout as geometry.shadows
+    self.shadow_cases = tuple(tuple(self.cells[i] for i in cases) for cases in self.geometry.shadows)
+    
   def grow_cost(self, size):
-    if size+1 not in self.trees_mine_by_size:
-      debug("grow_cost", size+1, self.trees_mine_by_size)
-    return size ** 2 + size + 1 + len(self.trees_mine_by_size[size+1])
+    return self.state.grow_cost(size)
   
   def seed_cost(self):
-    return len(self.trees_mine_by_size[0])
+    return self.state.seed_cost()
 
   def get_cases_shadow(self, case, day, size=3, reverse=False):
     """Get the cases impacted by a shadow cast by the `case` at `day` if a tree of `size` where on it.
     reverse = calculate the cases that will cast a shadow on this case. 
     """
-    output = []
-    current_case = case
-    day_mod = (day + 3 * reverse)%6
-    for _ in range(size):
-      if current_case.neighbors[day_mod] is None:
-        break
-      else:
-        output.append(current_case.neighbors[day_mod])
-        current_case = current_case.neighbors[day_mod]
-    return output
+    return self.shadow_cases[(case.index * 6 + (day + 3 * reverse) % 6) * 4 + size]
 
+  @hook
   def is_shadowed(self, case, day):
-    shadows = self.get_cases_shadow(case, day, size = 3, reverse = True)
-    i = 0
-    for case in shadows:
-      i+=1
-      if case.index in self.tree_by_cell_id:
-        tree = self.tree_by_cell_id[case.index]
-        if tree.size >= i:
-          return True
-    return False
+    return self.shadow_map.shadowed(case.index, day % 6)
   
+  @memoize
   def cell_ratio_shadow(self, cell, day):
     """return the ratio risk of being shadowed on this cell for the next 6 days."""
-    output=0
-    for delta_day in range(1, 7):
-      cases = self.get_cases_shadow(cell, day + delta_day, size = 3, reverse = True)
-      for index, case in enumerate(cases):
-        if case.index in self.tree_by_cell_id:
-          tree = self.tree_by_cell_id[case.index]
-          if tree.size + delta_day - (tree.is_dormant) > index:
-            output+=1/6
-            break
-            # TODO best delimitation of different cases by distance ? 
-    
-    return output
+    # TODO best delimitation of different cases by distance ? 
+    if day == self.day:
+      return self.shadow_ratios[cell.index]
+    return (self.shadow_map.forecast(day)[:, cell.index] > 0).sum() / 6
 
   def impact_shadow(self, case, day, size=3):
     """return the impact of the shadow on a given day. positive number means it will impact more the ennemy than us.
@@ -178,6 +247,8 @@ class Forest:
     
     return output
   
+  @hook
+  @memoize
   def impact_shadow_seed(self, case, day):
     """return the impact of the expected shadow of a seed planted on a given day. positive number means it will impact more the ennemy than us
     output = int, between -1 and 1
@@ -197,40 +268,14 @@ class Forest:
     
     return output / 4
 
-  def impact_growth_tree_on_sun(self, tree, day, delta_day=3):
-    """calculate the impact growing a tree on a given day will have on sun production for delta_days.
+  def impact_growth_tree_on_sun(self, tree):
+    """calculate the impact growing a tree will have on sun production for the forecast days.
     return two integers, (our_difference, opponent_difference)
     """
     if tree.size == 3:
       return (None, None)
 
-    our_diff = 0
-    opp_diff = 0
-
-    for i in range(1, delta_day+1):
-      # === if not shadowed, the tree will produce one more sun ===
-      if not self.is_shadowed(tree.cell, day+i):
-        our_diff+=1
-      
-      # === verify the impact of growing this tree on other trees ===
-      cases_impacted_shadow = self.get_cases_shadow(tree.cell, day+i, size=tree.size+1)
-      if len(cases_impacted_shadow) < tree.size or len(cases_impacted_shadow) == 0: # when we get to the edge
-        continue
-      else:
-        if cases_impacted_shadow[-1].index in self.tree_by_cell_id: # a new tree is impacted
-          impact_ratio = 1
-          # === check if a shadow is already cast on the tree ===
-          for index, case in enumerate(cases_impacted_shadow[:-1]):
-            if case.index in self.tree_by_cell_id and self.tree_by_cell_id[case.index].size >= tree.size-(index+1): # a shadow is already being cast
-              impact_ratio = 0.5
-              break
-          impacted_tree = self.tree_by_cell_id[cases_impacted_shadow[-1].index]
-          if impacted_tree.is_mine:
-            our_diff-=impacted_tree.size * impact_ratio
-          else:
-            opp_diff-=impacted_tree.size * impact_ratio
-    
-    return (our_diff, opp_diff)
+    return self.forecast.delta(tree.cell.index, tree.size + 1)
 
   def impact_growth_tree_on_seedable_surfaces(self, tree):
     """return a number indicating if the new surfaces seedables are worth it
@@ -239,14 +284,15 @@ class Forest:
     if tree.size > 2:
       return 0 
     output = 0
-    length = len(tree.cell.neighbors_by_size[tree.size + 1])
-    for cell in tree.cell.neighbors_by_size[tree.size + 1]:
-      if cell not in self.tree_by_cell_id:
-        output+= cell.richness / 3 * length
+    ring = self.geometry.rings[tree.cell.index * 4 + tree.size + 1]
+    length = len(ring)
+    for cell_index in ring:
+      output+= self.cells[cell_index].richness / 3 * length
 
     return output
 
 
+  @memoize
   def _case_get_seed_value(self, case, prefer_unshadowed = False):
     """get the value of the case"""
     # value : richness + shadow impact + is_shadowed + near higher cases
@@ -255,30 +301,32 @@ class Forest:
       return None
     value = case.richness # 1, 2, 3
     
-    shadow_direct_impact = 2 * self.impact_shadow_seed(case, self.day)
+    params = self.params
+    shadow_direct_impact = params.seed_shadow_impact * self.impact_shadow_seed(case, self.day)
     shadow_ombrage = 0
     # calculate ombrage for the next 3 days
     for i in range(2, 5):
       if self.is_shadowed(case, self.day+i):
-        shadow_ombrage-=1/i
+        shadow_ombrage-=params.seed_ombrage/i
     
     value+= shadow_direct_impact + shadow_ombrage
 
     if shadow_direct_impact == 0 and shadow_ombrage == 0:
-      debug(case, "unshadowed")
-      value+= 1 + 2 * prefer_unshadowed
+      LOG.debug(case, "unshadowed")
+      value+= params.seed_unshadowed + params.seed_prefer_unshadowed * prefer_unshadowed
     
     # check if the case is near a case with high richness
     for neigh in case.neighbors:
       if neigh != None:
-        value+=max(neigh.richness-1, 0)/(2*6) # can add a max of +1, this is just to differentiate some cases
+        value+=params.seed_neighbor_richness*max(neigh.richness-1, 0)/(2*6) # can add a max of +1, this is just to differentiate some cases
 
         if neigh.index in self.tree_by_cell_id: # calculate, for a 2nd time, if there are tree near this seed.
           tree = self.tree_by_cell_id[neigh.index]
-          value+= tree.size if not tree.is_mine else - tree.size * neigh.richness
+          value+= params.seed_opp_neighbor * tree.size if not tree.is_mine else - params.seed_own_neighbor * tree.size * neigh.richness
 
     return value
 
+  @hook
   def find_case_to_seed(self, prefer_unshadowed = False):
     """find the case and tree that can be seeded"""
     # calculate using this formula :
@@ -287,33 +335,39 @@ class Forest:
     # if the seed can in the next 3 turns grow and cast shadow on my tree, grant +1 interest by tree (still useful to seed here as it would prevent the opponent from doing so)
     # if a tree on a N richness cell can seed a N-1 richness cell, grant -0.5 interest by reichness difference
     seed_to_plant = (None, None, 1.5) #(tree, cell_to_seed, interest) - interest starts at 3 to prevent bad placements
+    # only the legal targets are valued, once each, in the order of the trees then of their range
+    values = {}
     for tree in self.trees_mine_active:
-      neighbors = list(itertools.chain.from_iterable(tree.cell.neighbors_by_size[i] for i in range(1, tree.size+1)))
-      for cell in neighbors:
-        if cell.richness != 0 and cell.index not in self.tree_by_cell_id:
-          cell_value = self._case_get_seed_value(cell, prefer_unshadowed)
-          if cell_value > seed_to_plant[2]:
-            seed_to_plant = (tree, cell, cell_value)
-    debug("cell_to_plant", seed_to_plant)
+      targets = set(self.legal.targets(tree.cell.index))
+      if not targets:
+        continue
+      for cell_index in self.geometry.ranges[tree.cell.index * 4 + tree.size]:
+        if cell_index not in targets:
+          continue
+        cell_value = values.get(cell_index)
+        if cell_value is None:
+          cell_value = values[cell_index] = self._case_get_seed_value(self.cells[cell_index], prefer_unshadowed)
+        if cell_value > seed_to_plant[2]:
+          seed_to_plant = (tree, self.cells[cell_index], cell_value)
+    LOG.debug("cell_to_plant", seed_to_plant)
     return seed_to_plant[0:2]
     
+  @hook
   def find_tree_to_grow(self, min_size = 0, prefer_unshadowed_tree = False):
     """find the best tree to grow"""
     output = None
     best = -9999
     prioritize_3 = len(self.trees_mine_by_size[3]) < self.max_level_3
-    for tree in self.trees_mine_active:
+    for cell_index in self.legal.grow:
+      tree = self.tree_by_cell_id[cell_index]
       # TODO calculate shadow impact
-      if tree.size >= 3 or tree.size < min_size:
+      if tree.size < min_size:
         continue
       
       grow_cost = self.grow_cost(tree.size)
-
-      if grow_cost > self.sun:
-        continue
       
       # === impact on sun production for the next 3 days ===
-      our_sun_diff, opp_sun_diff = self.impact_growth_tree_on_sun(tree, self.day, 3)
+      our_sun_diff, opp_sun_diff = self.impact_growth_tree_on_sun(tree)
       sun_opportunity = our_sun_diff - opp_sun_diff - grow_cost
 
       # === impact on new seedable cells ===
@@ -339,8 +393,9 @@ class Forest:
 
     return output
   
+  @hook
   def find_tree_to_complete(self):
-    if len(self.trees_mine_by_size[3]) == 0:
+    if len(self.legal.complete) == 0:
       return None
     
     only_cut_if_shadowed = False
@@ -356,29 +411,29 @@ class Forest:
 
     output = None
     best = -9999
-    for tree in self.trees_mine_by_size[3]:
-      if not tree.is_dormant:
-        score = tree.get_score(self.nutrients)
-        is_shadowed_day_1 = self.is_shadowed(tree.cell, self.day+1)
-        is_shadowed_day_2 = self.is_shadowed(tree.cell, self.day+2)
-        is_shadowed_day_3 = self.is_shadowed(tree.cell, self.day+3)
+    for cell_index in self.legal.complete:
+      tree = self.tree_by_cell_id[cell_index]
+      score = tree.get_score(self.nutrients)
+      is_shadowed_day_1 = self.is_shadowed(tree.cell, self.day+1)
+      is_shadowed_day_2 = self.is_shadowed(tree.cell, self.day+2)
+      is_shadowed_day_3 = self.is_shadowed(tree.cell, self.day+3)
   
-        if len(self.trees_mine_by_size[3]) <= self.min_level_3 + 1:  # only cut if the tree will have a really bad future production
-          only_cut_if_shadowed_condition = is_shadowed_day_1 and (is_shadowed_day_2 and is_shadowed_day_3)
-        elif len(self.trees_mine_by_size[3]) >= self.max_level_3-1:
-          only_cut_if_shadowed_condition = is_shadowed_day_1 # cut if it is menaced in the direct next day
-        else: # only cut if the tree will have a somewhat bad rendement
-          only_cut_if_shadowed_condition = is_shadowed_day_1 and (is_shadowed_day_2 or is_shadowed_day_3)
-
-        if is_shadowed_day_1: # evacute ombraged tree first
-          score+=10
-        if is_shadowed_day_2:
-          score+=5
-        if is_shadowed_day_3:
-          score+=1
-        if score > best and ((not only_cut_if_shadowed) + only_cut_if_shadowed * only_cut_if_shadowed_condition):
-          best = score
-          output = tree
+      if len(self.trees_mine_by_size[3]) <= self.min_level_3 + 1:  # only cut if the tree will have a really bad future production
+        only_cut_if_shadowed_condition = is_shadowed_day_1 and (is_shadowed_day_2 and is_shadowed_day_3)
+      elif len(self.trees_mine_by_size[3]) >= self.max_level_3-1:
+        only_cut_if_shadowed_condition = is_shadowed_day_1 # cut if it is menaced in the direct next day
+      else: # only cut if the tree will have a somewhat bad rendement
+        only_cut_if_shadowed_condition = is_shadowed_day_1 and (is_shadowed_day_2 or is_shadowed_day_3)
+
+      if is_shadowed_day_1: # evacute ombraged tree first
+        score+=10
+      if is_shadowed_day_2:
+        score+=5
+      if is_shadowed_day_3:
+        score+=1
+      if score > best and ((not only_cut_if_shadowed) + only_cut_if_shadowed * only_cut_if_shadowed_condition):
+        best = score
+        output = tree
 
     return output
 
@@ -439,24 +494,73 @@ class Forest:
     # ========= no actions could be found - stop round =======
     return "WAIT"
 
+  def policy(self, state):
+    """greedy action for a simulated state"""
+    if self.scratch is None:
+      self.scratch = Forest(self.cell_rows, self.reader, self.params)
+    self.scratch.load_state(state)
+    return parse_action(self.scratch.calculate_action())
+
+  def best_action(self):
+    """book or planned action, unless the evolved plans find better before the deadline"""
+    book = self.book_action() if self.use_book and self.search_time > 0 else None
+    if book is not None:
+      action = format_action(book)
+    else:
+      action = format_action(self.planner.next_action(self.state, self.frame_start + PLAN_TIME))
+      if self.search_time > 0:
+        deadline = self.frame_start + self.search_time
+        action = format_action(self.evolution.best_action(self.state.copy(), deadline, parse_action(action)))
+    LOG.info("day", self.day, "sun", self.sun, "score", self.score, "action", action)
+    if self.replay is not None:
+      self.replay.record(self.simulator.richness, self.state, parse_action(action))
+    self.check_turn(action)
+    report_hooks()
+    return action
+
+  def ponder(self, action, ready):
+    """evolve the plans of the next frame until its input is ready"""
+    if self.search_time > 0:
+      self.evolution.ponder(self.state, parse_action(action), ready)
+
+  def book_action(self):
+    """action of the opening book for this frame, None out of the book"""
+    if not self.book_loaded:
+      self.book_loaded = True
+      self.opening = Opening.load(self.geometry.neighbors, self.simulator.richness, self.state)
+    if self.opening is None:
+      return None
+    return self.opening.next_action(self.state, self.simulator)
+
+  def check_turn(self, action):
+    """dump the log of a turn over budget or playing an illegal action"""
+    elapsed = time.perf_counter() - self.frame_start
+    if elapsed > TURN_BUDGET:
+      LOG.dump(f"day {self.day}: turn took {elapsed * 1000:.1f}ms")
+    elif parse_action(action) not in self.legal:
+      LOG.dump(f"day {self.day}: illegal action {action}")
+
 class Cell:
+  __slots__ = ("index", "richness", "neighbors_id", "neighbors")
+
   def __init__(self, args):
     self.index = int(args[0])
     self.richness = int(args[1])
-    self.neighbors_id = list(map(int, args[2:8]))
-    self.neighbors = [None] * 6
-    self.neighbors_by_size = {i:[] for i in range(3)} # used to have all neighbors in range(1->3)
+    self.neighbors_id = array("b", map(int, args[2:8])) # -1 out of the map
+    self.neighbors = (None,) * 6
   
   def __repr__(self):
     return f"Cell {self.index}"
 
 class Tree:
+  __slots__ = ("cell_index", "cell", "size", "is_mine", "is_dormant", "shadow_ratio")
+
   def __init__(self, cells, args):
     self.cell_index = int(args[0])
     self.cell = cells[self.cell_index]
     self.size = int(args[1])
-    self.is_mine = args[2] != '0'
-    self.is_dormant = args[3] != '0'
+    self.is_mine = int(args[2]) != 0
+    self.is_dormant = int(args[3]) != 0
 
     self.shadow_ratio = -1
     
@@ -464,7 +568,7 @@ class Tree:
     return nutrients + 2 * (self.cell.richness - 1)
     
   def grow_cost(self, forest):
-    return self.size ** 2 + self.size +1 + len(forest.trees_mine_by_size[self.size+1])
+    return forest.grow_cost(self.size)
   
   def __repr__(self):
     return f"Tree - size {self.size} - is_mine : {self.is_mine} - dormant : {self.is_dormant} - cell_index : {self.cell_index} / {self.cell.index}]"
@@ -472,16 +576,21 @@ class Tree:
 
 
 # ============================ main code ================================
-FOREST = Forest()
+if __name__ == "__main__":
+  if HOOKS:
+    enable_hooks()
+  FOREST = Forest()
 
-# game loop
-while True:
+  # game loop
+  while True:
     # get all inputs
     FOREST.read_inputs_loop()
-    
-    action = FOREST.calculate_action()
 
-    print(action)
+    action = FOREST.best_action()
+
+    print(action, flush=True)
+
+    FOREST.ponder(action, FOREST.reader.ready)
 
 # was 382
 # was 478 -> 438 : find why the downside
\ No newline at end of file
@@ -1,9 +1,24 @@
-import sys
-from types import GeneratorType
-from typing import List, Tuple
-from collections import defaultdict
-
-MAX_DAY = 23
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from bitboard import State, bits, tree_price
+from endgame import Endgame
+from evolution import Evolution
+from forecast import forecast_directions
+from geometry import Geometry
+from hooks import enable_hooks, hook, report_hooks
+from log import TURN_BUDGET, Log
+from moves import LegalMoves
+from opening import USE_BOOK, Opening
+from planner import PLAN_TIME, DayPlanner
+from protocol import CellRow, Frame, Reader, TreeRow
+from shadowmap import ShadowMap
+from simulation import MAX_DAY, WAIT, Action, Simulator
+from tracker import Tracker
 
 MAX_SEEDS = 2
 MAX_GROWN = 7
@@ -11,46 +26,63 @@ MIN_GROWN = 3
 MAX_TREES = 9
 MIN_UNSHADOWED = 2
 
+GROW_IMPACT = 2  # weight of the seeding room a grown tree gains
+GROW_RICHNESS = 1  # weight of the richness of the cell
+GROW_SHADOWED = 2  # times the grow cost lost if the tree is shadowed tomorrow
+
+SEARCH_TIME = 0.04  # seconds of the turn given to the search, 0 to only play greedy
+HOOKS = False  # count and time the scorers, one stderr line per turn
+
 # UTILS
 
 
-def debug(*values, end='\n'):
-    print(*values, file=sys.stderr, end=end, flush=True)
+LOG = Log()
+
+
+@dataclass
+class Parameters:
+    """strategy constants, tuned by tune.py"""
+    max_seeds: int = MAX_SEEDS
+    max_grown: int = MAX_GROWN
+    min_grown: int = MIN_GROWN
+    max_trees: int = MAX_TREES
+    min_unshadowed: int = MIN_UNSHADOWED
+    grow_impact: float = GROW_IMPACT
+    grow_richness: float = GROW_RICHNESS
+    grow_shadowed: float = GROW_SHADOWED
 
 
-def tree_price(tree_count: List[int], size: int) -> int:
-    return pow(2, size) - 1 + tree_count[size]
+# (min, max) explored by the tuner, integer bounds for integer parameters
+PARAMETER_RANGES = {
+    "max_seeds": (1, 4),
+    "max_grown": (3, 10),
+    "min_grown": (0, 6),
+    "max_trees": (5, 14),
+    "min_unshadowed": (0, 5),
+    "grow_impact": (0.0, 4.0),
+    "grow_richness": (0.0, 3.0),
+    "grow_shadowed": (0.0, 4.0),
+}
+
 
 # CLASSES
 
 
 class Cell:
+    __slots__ = ("id", "richness", "neighbors_raw", "tree", "shadow_map", "params")
+
     def __init__(self, *args: str):
         self.id = int(args[0])
         self.richness = int(args[1])
-        self.neighbors_raw = map(int, args[2:])
-        self.neighbors = [None for _ in range(6)]
+        self.neighbors_raw = array("b", map(int, args[2:]))  # -1 out of the map
         self.tree = None
-        self.shadowable = [[None for _ in range(4)] for _ in range(6)]
-        self.__seed_score_day = None
-        self.__seed_score = None
 
     def __repr__(self) -> str:
         return f"@{self.id}({self.richness})"
 
-    def init(self, cells: List["Cell"]):
-        self.neighbors = [cells[i] if i >=
-                          0 else None for i in self.neighbors_raw]
-    
-    def precompute(self):
-        self.area = [self.compute_area(i, []) for i in range(4)]
-        for sun_dir in range(6):
-            remaining = 3
-            target = self.neighbors[sun_dir]
-            while target is not None and remaining > 0:
-                self.shadowable[sun_dir][4-remaining] = target
-                target = target.neighbors[sun_dir]
-                remaining -= 1
+    def precompute(self, shadow_map: ShadowMap, params: Parameters):
+        self.shadow_map = shadow_map
+        self.params = params
 
     @property
     def has_tree(self) -> bool:
@@ -59,112 +91,21 @@ class Cell:
     def reset(self):
         self.tree = None
 
-    def compute_area(self, size: int, included: List["Cell"]) -> List["Cell"]:
-        if size == 0:
-            return []
-        output = []
-        for neighbor in self.neighbors:
-            if neighbor is not None and neighbor not in included:
-                included += [neighbor]
-                output += [neighbor] + \
-                    neighbor.compute_area(size - 1, included)
-        return output
-
-    def shadowed_trees(self, sun_dir: int, size: int) -> List["Tree"]:
-        return [
-            cell.tree for cell in self.shadowable[sun_dir][:size + 1]
-            if cell is not None and
-            cell.has_tree and
-            cell.tree.size <= size
-        ]
-
-    def shadow_source_trees(self, sun_dir: int, size: int) -> List["Tree"]:
-        return [
-            cell.tree for i, cell in enumerate(self.shadowable[(sun_dir + 3) % 6])
-            if cell is not None and
-            cell.has_tree and
-            cell.tree.size >= i and
-            cell.tree.size >= size
-        ]
-
-    def shadow_score(self, sun_dir: int, size: int = None, *, offset_own: int = 0, actors_impact: bool = False) -> Tuple[float, float]:
-        if size == 0:
-            return 0, 0
-        own_score = 0
-        opp_score = 0
-        for tree in self.shadowed_trees(sun_dir, size):
-            actors = tree.shadow_sources(sun_dir)
-            if not self.has_tree or self.tree not in actors:
-                actors += [self]
-            impact_ratio = 1
-            if actors_impact and len(actors) > 1:
-                impact_ratio = 2  # len(actors)
-            if tree.is_mine:
-                own_score -= (tree.size + offset_own) / impact_ratio
-            else:
-                opp_score -= tree.size / impact_ratio
-        return own_score, opp_score
-
-    def seed_score(self, day: int, prefer_unshadowed: bool) -> float:
-        # from kalioz code : _case_get_seed_value
-        if self.__seed_score is None or self.__seed_score_day != day:
-            score = self.richness
-
-            shadow_score = 0
-            for delta in range(2, 5):  # direct future
-                own_score, opp_score = self.shadow_score(
-                    (day + delta) % 6, delta - 1, offset_own=1)
-                shadow_score += (own_score - opp_score) / (4 * delta)
-            for delta in range(6):  # full turn
-                own_score, opp_score = self.shadow_score(
-                    delta, 3, offset_own=1)
-                shadow_score += (own_score - opp_score) / (4 * 9)
-
-            shadowed_score = 0
-            for delta in range(2, 5):
-                if len(self.shadow_source_trees((day + delta) % 6, 0)) > 0:  # shadowed
-                    shadowed_score += 1 / delta
-
-            bonus = 0
-            if shadow_score == 0 and shadowed_score == 0:
-                bonus = 3 if prefer_unshadowed else 1
-
-            neighbors_score = 0
-            for cell in self.neighbors:
-                if cell is not None:
-                    neighbors_score += max(cell.richness - 1, 0) / 12
-                    if cell.has_tree:
-                        if cell.tree.is_mine:
-                            neighbors_score -= cell.tree.size * cell.richness
-                        else:
-                            neighbors_score += cell.tree.size * cell.richness
-
-            score = self.richness + shadow_score / 2 - \
-                shadowed_score + bonus + neighbors_score
-
-            debug(self, "seed_score", score)
-
-            self.__seed_score = self.richness + shadow_score / 2 - \
-                shadowed_score + bonus + neighbors_score
-            self.__seed_score_day = day
-        return self.__seed_score
-
 
 class Tree:
-    def __init__(self, cells: List[Cell], last_trees: List["Tree"], turn_start: bool, sun_dir: int, *args: str):
-        self.id = int(args[0])
+    __slots__ = ("id", "cell", "size", "is_mine", "is_dormant")
+
+    def __init__(self, cells: List[Cell], *args: int):
+        self.id = args[0]
         self.cell = cells[self.id]
-        self.size = int(args[1])
-        self.is_mine = args[2] == "1"
-        self.is_dormant = args[3] == "1"
+        self.size = args[1]
+        self.is_mine = args[2] == 1
+        self.is_dormant = args[3] == 1
         self.cell.tree = self
-        old_self = [tree for tree in last_trees if tree.id == self.id]
-        if len(old_self) == 0:
-            self.history = [self.size]
-        elif turn_start:
-            self.history = old_self[0].history + [self.size]
-        else:
-            self.history = old_self[0].history
+
+    @ property
+    def params(self) -> Parameters:
+        return self.cell.params
 
     def __repr__(self) -> str:
         return f"T{self.cell}=>{'M' if self.is_mine else 'O'}{'D' if self.is_dormant else 'A'}{self.size}"
@@ -173,105 +114,12 @@ class Tree:
     def grown(self) -> bool:
         return self.size == 3
 
-    @ property
-    def days(self) -> int:
-        return self.history.count(self.size)
-
     def tree_points(self, nutrients: int) -> int:
         return nutrients + 2 * (self.cell.richness - 1)
 
-    def seedable(self, size: int = None) -> List[Cell]:
-        size = size if size is not None else self.size
-        seeds = [
-            cell for cell in self.cell.area[size]
-            if not cell.has_tree and
-            cell.richness > 0
-        ]
-        return seeds
-
-    def sorted_seedable(self, day: int, prefer_unshadowed: bool) -> List[Cell]:
-        seeds = self.seedable()
-        return sorted(seeds, key=lambda cell: cell.seed_score(day,
-                                                              prefer_unshadowed), reverse=True)
-
-    @ property
-    def can_seed(self):
-        return self.size > 0 and len(self.seedable()) > 0
-
-    def shadow_sources(self, sun_dir: int, size: int = None) -> List["Tree"]:
-        size = size if size is not None else self.size
-        return self.cell.shadow_source_trees(sun_dir, size)
-
     def shadowed(self, sun_dir: int, size: int = None) -> bool:
         size = size if size is not None else self.size
-        return len(self.shadow_sources(sun_dir, size)) > 0
-
-    def sun(self, sun_dir: int, size: int = None) -> int:
-        size = size if size is not None else self.size
-        return size if not self.shadowed(sun_dir, size) else 0
-
-    def shadow_score(self, sun_dir: int, size: int = None) -> Tuple[float, float]:
-        size = size if size is not None else self.size
-        if size == 0:
-            return 0, 0
-        own_score, opp_score = self.cell.shadow_score(
-            sun_dir, size, actors_impact=True)
-        return (own_score + self.sun(sun_dir, size)), opp_score
-
-    def range_shadow_score(self, start_day: int, delta_days: int, size: int = None) -> Tuple[float, float]:
-        size = size if size is not None else self.size
-        own_score, opp_score = 0, 0
-        for day in range(start_day + 1, min(start_day + delta_days + 1, MAX_DAY + 1)):
-            own_score_day, opp_score_day = self.shadow_score(day % 6, size)
-            own_score += own_score_day
-            opp_score += opp_score_day
-        return own_score, opp_score
-
-    def range_shadow_score_diff(self, start_day: int, delta_days: int) -> Tuple[float, float]:
-        own_score0, opp_score0 = self.range_shadow_score(
-            start_day, delta_days, self.size)
-        own_score1, opp_score1 = self.range_shadow_score(
-            start_day, delta_days, self.size + 1)
-        return own_score1 - own_score0, opp_score1 - opp_score0
-
-    def growth_seed_impact(self) -> float:
-        # from kalioz code : impact_growth_tree_on_seedable_surfaces
-        seedable0 = self.seedable()
-        seedable1 = self.seedable(self.size + 1)
-        richnesses = [
-            cell.richness for cell in seedable1 if cell not in seedable0]
-        if len(richnesses) == 0:
-            return 0
-        return sum(richnesses) / (3 * len(richnesses))
-
-    def grow_score(self, day: int, tree_count: List[int]) -> float:
-        # from kalioz code : find_tree_to_grow
-        grow_cost = tree_price(tree_count, self.size + 1)
-
-        own_diff, opp_diff = self.range_shadow_score_diff(day, 3)
-        sun_score = own_diff - opp_diff - grow_cost
-
-        debug(self, "sun_score", sun_score)
-
-        impact = self.growth_seed_impact()
-
-        debug(self, "impact", impact)
-
-        score = sun_score + 2 * impact
-
-        if day < 3:
-            score += self.cell.richness
-        elif tree_count[3] < MAX_GROWN:
-            score += self.cell.richness * (self.size + 1) ** 2
-        else:
-            score += self.cell.richness * (self.size + 1)
-
-        if self.shadowed((day + 1) % 6):
-            score -= 2 * grow_cost
-
-        debug(self, "grow_score", score)
-
-        return score
+        return self.cell.shadow_map.shadowed(self.id, sun_dir, size)
 
     def complete_score(self, day: int, tree_count: List[int], nutrients: int, complete_shadowed: bool) -> float:
         # from kalioz code : find_tree_to_complete
@@ -285,14 +133,14 @@ class Tree:
                      else 0 for delta in range(1, 4))
 
         shadow_condition = False
-        if tree_count[3] <= MIN_GROWN + 1:
+        if tree_count[3] <= self.params.min_grown + 1:
             shadow_condition = all(forecast[1:])
-        elif tree_count[3] >= MAX_GROWN - 1:
+        elif tree_count[3] >= self.params.max_grown - 1:
             shadow_condition = forecast[1]
         else:
             shadow_condition = forecast[1] + any(forecast[2:])
 
-        debug(self, "complete_score", score)
+        LOG.debug(self, "complete_score", score)
 
         if not complete_shadowed or shadow_condition:
             return score
@@ -300,87 +148,288 @@ class Tree:
             return 0
 
 
+class Batch:
+    """seed and grow scores of every candidate at once
+
+    the features of the candidates are put in arrays and scored by the
+    same float operations as the scalar scorers they were written from, in
+    the same order, so that the rankings are exactly the same. those
+    scorers are kept in tests/test_klemek.py to check it.
+    """
+
+    def __init__(self, cells: List[Cell], geometry: Geometry, params: Parameters):
+        self.params = params
+        self.count = count = len(cells)
+        # targets[sun_dir, distance - 1, cell] = cell shadowed from that distance,
+        # `count` (an always empty padding cell) when out of the map
+        targets = [[[count] * count for _ in range(3)] for _ in range(6)]
+        for sun_dir in range(6):
+            for cell in range(count):
+                for distance, target in enumerate(geometry.shadowed_cells(cell, sun_dir)):
+                    targets[sun_dir][distance][cell] = target
+        self.targets = np.array(targets, dtype=np.int64)
+        self.reach = np.arange(1, 4).reshape(1, 3, 1)  # distance of each shadowed cell
+        self.richness = np.array([cell.richness for cell in cells] + [0], dtype=np.int64)
+        self.neighbors = np.array([[neighbor if neighbor >= 0 else count for neighbor in cell.neighbors_raw]
+                                   for cell in cells], dtype=np.int64)
+        # max(richness - 1, 0) / 12 of each neighbor, 0 out of the map
+        self.neighbor_richness = np.maximum(self.richness[self.neighbors] - 1, 0) / 12
+        # ring[cell, distance, other] = the other cell has soil and is at that distance from the cell
+        self.ring = np.array([[[geometry.ring_masks[cell * 4 + distance] >> other & 1 and cell_richness > 0
+                                for other, cell_richness in enumerate(self.richness[:count])]
+                               for distance in range(4)] for cell in range(count)], dtype=np.int64)
+        self.base_costs = np.array([pow(2, size + 1) - 1 for size in range(3)], dtype=np.int64)  # see tree_price
+        self.sizes = np.full(count + 1, -1, dtype=np.int64)
+        self.signs = np.zeros(count + 1, dtype=np.int64)  # 1 for our trees, -1 for the opponent
+        self.losses = np.zeros(count + 1, dtype=np.int64)  # own - opp sun lost if the tree is spooked
+        self.free = np.zeros(count, dtype=np.int64)  # 1 for the cells without a tree
+        # sources[sun_dir, distance - 1, cell] = cell shadowing the cell from that distance, the
+        # cells it shadows with the sun on the other side, the padding cell included
+        self.sources = np.concatenate([self.targets[[(sun_dir + 3) % 6 for sun_dir in range(6)]],
+                                       np.full((6, 3, 1), count, dtype=np.int64)], axis=2)
+        self.days = np.arange(6).reshape(-1, 1, 1)
+        # sun directions of the forecast days after each day
+        self.sun_dirs = [np.array(forecast_directions(day), dtype=np.int64).reshape(-1, 1, 1)
+                         for day in range(MAX_DAY + 1)]
+        # a tree of `size` growing and a tree of `target_size` at `distance` in its shadow,
+        # by key (size * 3 + distance - 1) * 5 + target_size + 1: whether the target is
+        # only shadowed once grown, and whether the tree spooks it before growing
+        self.grow_keys = np.array([[(size * 3 + distance) * 5 + 1 for size in range(3)]
+                                   for distance in range(3)], dtype=np.int64)
+        added, spooked = [], []
+        for size in range(3):
+            for distance in range(1, 4):
+                for target_size in range(-1, 4):
+                    added.append(0 <= target_size <= size + 1 and distance <= size + 1 and
+                                 (distance == size + 1 or target_size == size + 1))
+                    spooked.append(size >= distance and size >= target_size)
+        self.added = np.array(added, dtype=np.int64)
+        self.spooked = np.array(spooked, dtype=bool)
+        # sun_gain[size, strength] = sun a tree gains on a day by growing under that shadow
+        self.sun_gain = np.array([[(size + 1 if strength < size + 1 else 0) - (size if strength < size else 0)
+                                   for strength in range(4)] for size in range(3)], dtype=np.int64)
+
+    def update(self, state: State):
+        sizes = [-1] * (self.count + 1)
+        signs = [0] * (self.count + 1)
+        for size, mask in enumerate(state.sizes):
+            for cell in bits(mask):
+                sizes[cell] = size
+                signs[cell] = 1 if state.mine >> cell & 1 else -1
+        self.sizes = np.array(sizes, dtype=np.int64)
+        self.signs = np.array(signs, dtype=np.int64)
+        self.losses = -self.signs * self.sizes
+        self.free = (self.sizes[:self.count] < 0).astype(np.int64)
+
+    def shadow_deltas(self, cells: np.ndarray, day: int) -> np.ndarray:
+        """own - opp score of the shadows a tree on each cell would cast, our trees counting
+        one more than their size: on the next days as a seed grows, then for a grown tree
+        in each direction. one row per day and one column per cell"""
+        sun_dirs = [(day + delta) % 6 for delta in range(2, 5)] + list(range(6))
+        sizes = np.array([delta - 1 for delta in range(2, 5)] + [3] * 6).reshape(-1, 1, 1)
+        targets = self.targets[sun_dirs][:, :, cells]
+        tree_sizes = self.sizes[targets]
+        signs = self.signs[targets]
+        # our trees count size + 1 against us, the opponent trees size for us
+        values = np.where(signs > 0, -(tree_sizes + 1), np.where(signs < 0, tree_sizes, 0))
+        reached = (self.reach <= sizes) & (tree_sizes <= sizes)
+        return np.where(reached, values, 0).sum(axis=1)
+
+    @hook
+    def seed_scores(self, cells: List[int], day: int, prefer_unshadowed: bool,
+                    shadow_map: ShadowMap) -> np.ndarray:
+        """score of seeding each cell, from kalioz code : _case_get_seed_value"""
+        ids = np.array(cells, dtype=np.int64)
+        deltas = self.shadow_deltas(ids, day)
+        # added one by one, in the order of the scalar code
+        divisors = [4 * delta for delta in range(2, 5)] + [4 * 9] * 6
+        shadow_score = np.zeros(len(cells))
+        for row, divisor in enumerate(divisors):
+            shadow_score = shadow_score + deltas[row] / divisor
+
+        shadowed_score = np.zeros(len(cells))
+        for delta in range(2, 5):
+            shadowed = shadow_map.strength[(day + delta) % 6][ids] >= 1
+            shadowed_score = shadowed_score + np.where(shadowed, 1 / delta, 0.0)
+
+        bonus = np.where((shadow_score == 0) & (shadowed_score == 0), 3 if prefer_unshadowed else 1, 0)
+
+        neighbors = self.neighbors[ids]
+        trees = np.where(self.sizes[neighbors] >= 0, self.sizes[neighbors], 0) * self.richness[neighbors]
+        trees = -self.signs[neighbors] * trees
+        neighbor_richness = self.neighbor_richness[ids]
+        neighbors_score = np.zeros(len(cells))
+        for direction in range(6):
+            neighbors_score = neighbors_score + neighbor_richness[:, direction]
+            neighbors_score = neighbors_score + trees[:, direction]
+
+        return self.richness[ids] + shadow_score / 2 - shadowed_score + bonus + neighbors_score
+
+    def shadow_diffs(self, cells: np.ndarray, sizes: np.ndarray, day: int,
+                     shadow_map: ShadowMap) -> np.ndarray:
+        """own - opp change of the shadow score over the forecast days if the trees grow
+
+        the shadow score of a tree of some size on a day is its sun and, taken
+        away, the size of the trees of at most that size it shadows, halved
+        for the trees that another tree also spooks.
+        """
+        sun_dirs = self.sun_dirs[day]
+        # (day, distance - 1, tree) of the shadowed cells
+        targets = self.targets[sun_dirs, self.reach - 1, cells]
+        keys = self.grow_keys[:, sizes] + self.sizes[targets]
+        # trees spooking each cell on the days, those of the growing tree don't halve the loss
+        sources = self.sizes[self.sources[sun_dirs[:, 0, 0]]]
+        spooks = ((sources >= self.reach) & (sources >= self.sizes)).sum(axis=1)
+        halved = spooks[self.days[:len(sun_dirs)], targets] > self.spooked[keys]
+        loss = self.added[keys] * self.losses[targets] / (1 + halved)
+        sun = self.sun_gain[sizes, shadow_map.strength[sun_dirs[:, :, 0], cells]]
+        return loss.sum(axis=(0, 1)) + sun.sum(axis=0)
+
+    @hook
+    def grow_scores(self, trees: List[Tree], day: int, tree_count: List[int],
+                    shadow_map: ShadowMap) -> np.ndarray:
+        """score of growing each tree, from kalioz code : find_tree_to_grow"""
+        params = self.params
+        cells = np.array([tree.id for tree in trees], dtype=np.int64)
+        size = self.sizes[cells]
+        cost = self.base_costs[size] + np.array(tree_count)[size + 1]
+
+        # mean richness / 3 of the free cells the grown tree can seed in addition
+        gained = self.ring[cells, size + 1]
+        impact = (gained @ (self.free * self.richness[:self.count])) / np.maximum(3 * (gained @ self.free), 1)
+
+        score = (self.shadow_diffs(cells, size, day, shadow_map) - cost) + params.grow_impact * impact
+        richness = params.grow_richness * self.richness[cells]
+        if day < 3:
+            score = score + richness
+        elif tree_count[3] < params.max_grown:
+            score = score + richness * (size + 1) ** 2
+        else:
+            score = score + richness * (size + 1)
+        shadowed = shadow_map.strength[(day + 1) % 6][cells] >= np.maximum(size, 1)
+        return np.where(shadowed, score - params.grow_shadowed * cost, score)
+
+
 class Game:
-    def __init__(self):
+    def __init__(self, params: Parameters = None):
+        self.params = params if params is not None else Parameters()
         self.day = -1
         self.trees = []
-
-    def input_cells(self, raw_cells: List[List[str]]):
-        self.cells = [Cell(*line) for line in raw_cells]
-        for cell in self.cells:
-            cell.init(self.cells)
+        self.tracker = Tracker()
+        self.state = self.tracker.state
+        self.scratch = None  # game used to evaluate simulated states
+        self.frame_start = 0
+        self.search_time = SEARCH_TIME
+        self.frame = None
+        self.legal = LegalMoves()  # legal actions of the frame
+        self.replay = None  # replay.Writer recording each turn
+        self.opening = None  # book moves of this map
+        self.book_loaded = False
+        self.use_book = USE_BOOK
+
+    def input_cells(self, raw_cells: List[CellRow]):
+        self.raw_cells = raw_cells
+        self.cells = [Cell(*line) for line in self.raw_cells]
+        self.geometry = Geometry([cell.neighbors_raw for cell in self.cells])
+        self.shadow_map = ShadowMap(self.geometry)
         for cell in self.cells:
-            cell.precompute() 
+            cell.precompute(self.shadow_map, self.params)
+        self.simulator = Simulator(
+            self.geometry, [cell.richness for cell in self.cells])
+        self.evolution = Evolution(self.simulator,
+                                   endgame=Endgame(self.simulator))
+        self.planner = DayPlanner(self.simulator, self.policy)
+        self.batch = Batch(self.cells, self.geometry, self.params)
 
     def input_turn_start(self, day: int, nutrients: int):
+        self.frame_start = time.perf_counter()
         self.turn_start = day != self.day
         self.day = day
         self.sun_dir = day % 6
         self.nutrients = nutrients
-        debug("day", day)
-        debug("nutrients", nutrients)
+        LOG.debug("day", day)
+        LOG.debug("nutrients", nutrients)
 
     def input_player(self, *args: List[str]):
         self.sun, self.score = map(int, args)
-        debug("sun", self.sun)
+        LOG.debug("sun", self.sun)
 
     def input_opponent(self, *args: List[str]):
         self.opp_sun, self.opp_score, self.opp_is_waiting = map(int, args)
         self.opp_is_waiting = self.opp_is_waiting == 1
 
-    def input_trees(self, raw_trees: List[List[str]]):
-        for cell in self.cells:
-            cell.reset()
-        last_trees = self.trees
-        self.trees = [Tree(self.cells, last_trees, self.turn_start,
-                           self.sun_dir, *line) for line in raw_trees]
-        self.tree_count = defaultdict(lambda: 0)
-        for tree in self.trees:
-            if tree.is_mine:
-                self.tree_count[tree.size] += 1
-
+    def input_trees(self, raw_trees: List[TreeRow]):
+        changed = self.tracker.update(self.day, raw_trees)
+        for cell_id in changed:
+            cell = self.cells[cell_id]
+            if cell.has_tree:
+                self.trees.remove(cell.tree)
+                cell.reset()
+            row = self.tracker.rows[cell_id]
+            if row is not None:
+                tree = Tree(self.cells, *row)
+                index = 0
+                while index < len(self.trees) and self.trees[index].id < tree.id:
+                    index += 1
+                self.trees.insert(index, tree)
+        self.state = self.tracker.state
+        self.state.day = self.day
+        self.state.nutrients = self.nutrients
+        self.state.sun, self.state.score = self.sun, self.score
+        self.state.opp_sun, self.state.opp_score = self.opp_sun, self.opp_score
+        self.state.opp_is_waiting = self.opp_is_waiting
+        self.tree_count = self.state.tree_count()
+        self.shadow_map.update(self.state)
+        self.batch.update(self.state)
+
+    @hook
     def best_complete(self, complete_shadowed: bool) -> Tree:
         if self.day < MAX_DAY and (
             # prevent cutting the last 3 tree
             len(self.mine) - self.tree_count[0] < 3 or
             # keep at least some fully grown trees
-            self.tree_count[3] <= MIN_GROWN
+            self.tree_count[3] <= self.params.min_grown
         ):
             return None
-        completable = [
-            tree for tree in self.available
-            if tree.grown
-        ]
+        completable = [self.cells[cell].tree for cell in self.legal.complete]
         completable.sort(key=lambda tree: tree.complete_score(
             self.day, self.tree_count, self.nutrients, complete_shadowed), reverse=True)
-        debug("completable", completable)
+        LOG.debug("completable", completable)
         return completable[0] if len(completable) > 0 and completable[0].complete_score(
             self.day, self.tree_count, self.nutrients, complete_shadowed) > 0 else None
 
+    @hook
     def best_grow(self, min_size=0) -> Tree:
         growable = [
-            tree for tree in self.available
-            if not tree.grown and
-            tree.size >= min_size and
-            self.sun >= tree_price(self.tree_count, tree.size + 1)
+            self.cells[cell].tree for cell in self.legal.grow
+            if self.cells[cell].tree.size >= min_size
         ]
-        growable.sort(key=lambda tree: tree.grow_score(
-            self.day, self.tree_count), reverse=True)
-        debug("growable", growable)
-        return growable[0] if len(growable) > 0 else None
+        LOG.debug("growable", growable)
+        if len(growable) == 0:
+            return None
+        scores = self.batch.grow_scores(growable, self.day, self.tree_count, self.shadow_map)
+        return growable[int(np.argmax(scores))]
 
+    @hook
     def best_seed(self, prefer_unshadowed: bool) -> Tuple[Tree, Cell]:
         # from kalioz code : find_case_to_seed
-        seeders = [tree for tree in self.available if tree.can_seed]
-
-        targets = [(tree, tree.sorted_seedable(self.day, prefer_unshadowed)[0])
-                   for tree in seeders]
-
-        targets.sort(key=lambda t: t[1].seed_score(
-            self.day, prefer_unshadowed), reverse=True)
-
-        return targets[0] if len(targets) > 0 and targets[0][1].seed_score(
-            self.day, prefer_unshadowed) > 1.5 else None
+        # first best target of the first best seeder, as a stable sort would give
+        pairs = [(source, target) for source, targets in self.legal.seeds.items()
+                 for target in targets]
+        if len(pairs) == 0:
+            return None
+        cells = sorted(self.legal.sources)
+        scores = self.batch.seed_scores(
+            cells, self.day, prefer_unshadowed, self.shadow_map)
+        index = [0] * len(self.cells)
+        for position, cell in enumerate(cells):
+            index[cell] = position
+        pair_scores = scores[[index[target] for _, target in pairs]]
+        best = int(np.argmax(pair_scores))
+        if pair_scores[best] <= 1.5:
+            return None
+        source, target = pairs[best]
+        return self.cells[source].tree, self.cells[target]
 
     def output_move(self):
         if self.turn_start:
@@ -390,13 +439,13 @@ class Game:
         self.mine = [tree for tree in self.trees if tree.is_mine]
         self.available = [tree for tree in self.mine if not tree.is_dormant]
 
-        debug("available", self.available)
+        LOG.debug("available", self.available)
 
         allow_complete = (
             self.sun >= 4 and self.day > 10 and
             (
                 self.score <= self.opp_score or
-                self.tree_count[3] > MIN_GROWN or
+                self.tree_count[3] > self.params.min_grown or
                 self.day >= MAX_DAY
             )
         )
@@ -410,8 +459,8 @@ class Game:
         allow_seed = (
             self.day > 0 and
             self.day < MAX_DAY - 1 and
-            len(self.mine) < MAX_TREES and
-            self.tree_count[0] < MAX_SEEDS and
+            len(self.mine) < self.params.max_trees and
+            self.tree_count[0] < self.params.max_seeds and
             tree_price(self.tree_count, 0) <= self.sun
         )
         
@@ -419,13 +468,13 @@ class Game:
             tree for tree in self.mine if not tree.shadowed(self.day % 6)]
         prefer_unshadowed = (
             self.day < MAX_DAY - 5 and
-            len(unshadowed) < MIN_UNSHADOWED
+            len(unshadowed) < self.params.min_unshadowed
         )
 
-        debug("allow_complete", allow_complete)
-        debug("min_grow", min_grow)
-        debug("allow_seed", allow_seed)
-        debug("prefer_unshadowed", prefer_unshadowed)
+        LOG.debug("allow_complete", allow_complete)
+        LOG.debug("min_grow", min_grow)
+        LOG.debug("allow_seed", allow_seed)
+        LOG.debug("prefer_unshadowed", prefer_unshadowed)
 
         # TODO, precompute actions and sort to promote seed
 
@@ -447,17 +496,99 @@ class Game:
 
         return "WAIT", "würst"
 
+    def input_frame(self, frame: Frame):
+        self.input_turn_start(frame.day, frame.nutrients)
+        self.input_player(frame.sun, frame.score)
+        self.input_opponent(frame.opp_sun, frame.opp_score,
+                            int(frame.opp_is_waiting))
+        self.input_trees(frame.trees)
+        self.legal = LegalMoves.parse(frame.raw_moves)
+        self.frame = frame
+
+    def load_state(self, state: State):
+        self.input_turn_start(state.day, state.nutrients)
+        self.input_player(state.sun, state.score)
+        self.input_opponent(state.opp_sun, state.opp_score,
+                            int(state.opp_is_waiting))
+        self.input_trees(state.rows())
+        self.legal = LegalMoves.generate(self.simulator, state)
+
+    def policy(self, state: State) -> Action:
+        if self.scratch is None:
+            self.scratch = Game(self.params)
+            self.scratch.input_cells(self.raw_cells)
+        self.scratch.load_state(state)
+        move = self.scratch.output_move()
+        return WAIT if move[0] == "WAIT" else move
+
+    def best_move(self):
+        move = self.search_move()
+        LOG.info("day", self.day, "sun", self.sun,
+                 "score", self.score, "move", *move)
+        if self.replay is not None:
+            self.replay.record(self.simulator.richness, self.state,
+                               WAIT if move[0] == "WAIT" else move)
+        self.check_turn(move)
+        report_hooks()
+        return move
+
+    def ponder(self, move, ready: Callable[[], bool]):
+        # evolve the plans of the next frame until its input is ready
+        if self.search_time > 0:
+            self.evolution.ponder(
+                self.state, WAIT if move[0] == "WAIT" else move, ready)
+
+    def planned_move(self):
+        action = self.planner.next_action(
+            self.state, self.frame_start + PLAN_TIME)
+        return action if action != WAIT else ("WAIT", "würst")
+
+    def search_move(self):
+        if self.search_time <= 0:
+            return self.planned_move()
+        book = self.book_action() if self.use_book else None
+        if book is not None:
+            return book if book != WAIT else ("WAIT", "würst")
+        move = self.planned_move()
+        fallback = WAIT if move[0] == "WAIT" else move
+        action = self.evolution.best_action(
+            self.state.copy(), self.frame_start + self.search_time, fallback)
+        if action == fallback:
+            return move
+        return action if action != WAIT else ("WAIT", "würst")
+
+    def book_action(self) -> Action:
+        # action of the opening book for this frame, None out of the book
+        if not self.book_loaded:
+            self.book_loaded = True
+            self.opening = Opening.load(
+                self.geometry.neighbors, self.simulator.richness, self.state)
+        if self.opening is None:
+            return None
+        return self.opening.next_action(self.state, self.simulator)
+
+    def check_turn(self, move):
+        # dump the log of a turn over budget or playing an illegal move
+        elapsed = time.perf_counter() - self.frame_start
+        action = WAIT if move[0] == "WAIT" else move
+        if elapsed > TURN_BUDGET:
+            LOG.dump(f"day {self.day}: turn took {elapsed * 1000:.1f}ms")
+        elif action not in self.legal:
+            LOG.dump(f"day {self.day}: illegal move {' '.join(map(str, move))}")
+
 
 # INIT
-game = Game()
-
-game.input_cells(input().split() for _ in range(int(input())))
-
-# GAME LOOP
-while True:
-    game.input_turn_start(int(input()), int(input()))
-    game.input_player(*input().split())
-    game.input_opponent(*input().split())
-    game.input_trees(input().split() for _ in range(int(input())))
-    [input() for _ in range(int(input()))]  # possible actions ignored
-    print(*game.output_move())
+if __name__ == "__main__":
+    if HOOKS:
+        enable_hooks()
+    game = Game()
+    reader = Reader()
+
+    game.input_cells(reader.read_cells())
+
+    # GAME LOOP
+    while True:
+        game.input_frame(reader.read_frame())
+        move = game.best_move()
+        print(*move, flush=True)
+        game.ponder(move, reader.ready)
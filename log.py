@@ -0,0 +1,69 @@
+import sys
+from collections import deque
+from typing import Any, TextIO, Tuple
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+CAPACITY = 512  # records kept for the next dump
+TURN_BUDGET = 0.09  # seconds a turn can take before the records are dumped
+
+
+def skip(*values: Any):
+    pass
+
+
+class Log:
+    """leveled logger writing nothing until asked to
+
+    records at or above `level` are kept, unformatted, in a ring buffer that
+    is only written by dump(). records at or above `echo` are also written
+    right away. the methods of the disabled levels are a bare no-op, so their
+    arguments are never formatted.
+    """
+
+    def __init__(self, level: int = INFO, echo: int = WARNING,
+                 capacity: int = CAPACITY, stream: TextIO = None):
+        self.stream = stream
+        self.records: deque = deque(maxlen=capacity)
+        self.set_level(level, echo)
+
+    def set_level(self, level: int, echo: int = None):
+        self.level = level
+        self.echo = echo if echo is not None else self.echo
+        self.debug = self._method(DEBUG)
+        self.info = self._method(INFO)
+        self.warning = self._method(WARNING)
+        self.error = self._method(ERROR)
+
+    def _method(self, level: int):
+        if level >= self.echo:
+            return lambda *values: self._echo(level, values)
+        if level >= self.level:
+            return lambda *values: self.records.append((level, values))
+        return skip
+
+    def _echo(self, level: int, values: Tuple):
+        self.records.append((level, values))
+        self.write(self.format(level, values) + "\n")
+
+    def write(self, text: str):
+        (self.stream if self.stream is not None else sys.stderr).write(text)
+
+    @staticmethod
+    def format(level: int, values: Tuple) -> str:
+        return " ".join([NAMES[level], *map(str, values)])
+
+    def dump(self, reason: str):
+        """write the ring buffer in one go and empty it"""
+        if self.level >= OFF:
+            return
+        lines = [f"--- {reason}, last {len(self.records)} records ---"]
+        lines += [self.format(level, values) for level, values in self.records]
+        self.records.clear()
+        self.write("\n".join(lines) + "\n")
@@ -0,0 +1,42 @@
+import functools
+from typing import Any, Callable, Dict
+
+from tracker import Tracker
+
+
+class Memo:
+    """results of the evaluation functions, valid for one version of the tracker"""
+
+    def __init__(self, tracker: Tracker):
+        self.tracker = tracker
+        self.version = tracker.version
+        self.results: Dict[tuple, Any] = {}
+
+    def invalidate(self):
+        """drop every result, for changes the tracker doesn't see"""
+        self.results = {}
+        self.version = self.tracker.version
+
+
+def memoize(method: Callable) -> Callable:
+    """cache a method per tree layout, the instance must have a `memo` attribute"""
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        memo = self.memo
+        if memo.version != memo.tracker.version:
+            memo.invalidate()
+        key = (name, self, *args, *sorted(kwargs.items()))
+        try:
+            return memo.results[key]
+        except KeyError:
+            pass
+        except TypeError:  # lists in the arguments
+            key = tuple(tuple(arg) if isinstance(arg, list) else arg for arg in key)
+            if key in memo.results:
+                return memo.results[key]
+        value = memo.results[key] = method(self, *args, **kwargs)
+        return value
+
+    return wrapper
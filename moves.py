@@ -0,0 +1,117 @@
+import re
+from typing import Dict, List, Optional
+
+from bitboard import State, bits
+from simulation import COMPLETE_COST, WAIT, Action, Simulator
+
+NO_TARGETS: List[int] = []
+
+COMPLETE_LINE = re.compile(rb"^COMPLETE (\d+)", re.MULTILINE)
+GROW_LINE = re.compile(rb"^GROW (\d+)", re.MULTILINE)
+SEED_LINE = re.compile(rb"^SEED (\d+) (\d+)", re.MULTILINE)
+
+
+class LegalMoves:
+    """legal actions of a frame, indexed by kind, source and target cell
+
+    read from the possible moves the referee sends, or generated from a
+    simulated state. the lines of each kind are only parsed when that kind
+    is read, most frames never look at the seeds. the CodinGame referee
+    shuffles its list, so the parsed cells are sorted in increasing order,
+    as generated: the bots break their ties the same way online and in
+    the local arena.
+    """
+    __slots__ = ("raw", "_complete", "_grow", "_seeds", "_sources")
+
+    def __init__(self, raw: bytes = b""):
+        self.raw = raw
+        self._complete: Optional[List[int]] = None
+        self._grow: Optional[List[int]] = None
+        self._seeds: Optional[Dict[int, List[int]]] = None  # source -> targets
+        self._sources: Optional[Dict[int, List[int]]] = None  # target -> sources
+
+    @classmethod
+    def parse(cls, raw_moves: bytes) -> "LegalMoves":
+        """the index of the possible moves lines of a frame, parsed on demand"""
+        return cls(raw_moves)
+
+    @classmethod
+    def generate(cls, simulator: Simulator, state: State) -> "LegalMoves":
+        """the same index, built from the bitboards where there's no list to read"""
+        moves = cls()
+        active = state.mine & ~state.dormant
+        moves._complete = list(bits(active & state.sizes[3])) if state.sun >= COMPLETE_COST else []
+        growable = 0
+        for size in range(3):
+            if state.grow_cost(size) <= state.sun:
+                growable |= state.sizes[size]
+        moves._grow = list(bits(active & growable))
+        moves._seeds, moves._sources = {}, {}
+        if state.seed_cost() <= state.sun:
+            free = simulator.usable & ~state.trees
+            range_masks = simulator.geometry.range_masks
+            for source in bits(active & ~state.sizes[0]):
+                targets = range_masks[source * 4 + state.size(source)] & free
+                for target in bits(targets):
+                    moves.add_seed(source, target)
+        return moves
+
+    @property
+    def complete(self) -> List[int]:
+        if self._complete is None:
+            self._complete = sorted(int(cell) for cell in COMPLETE_LINE.findall(self.raw))
+        return self._complete
+
+    @property
+    def grow(self) -> List[int]:
+        if self._grow is None:
+            self._grow = sorted(int(cell) for cell in GROW_LINE.findall(self.raw))
+        return self._grow
+
+    @property
+    def seeds(self) -> Dict[int, List[int]]:
+        if self._seeds is None:
+            self._parse_seeds()
+        return self._seeds
+
+    @property
+    def sources(self) -> Dict[int, List[int]]:
+        if self._sources is None:
+            self._parse_seeds()
+        return self._sources
+
+    def _parse_seeds(self):
+        self._seeds, self._sources = {}, {}
+        for source, target in sorted((int(source), int(target))
+                                     for source, target in SEED_LINE.findall(self.raw)):
+            self.add_seed(source, target)
+
+    def add_seed(self, source: int, target: int):
+        self._seeds.setdefault(source, []).append(target)
+        self._sources.setdefault(target, []).append(source)
+
+    def targets(self, source: int) -> List[int]:
+        """cells the tree on `source` can seed"""
+        return self.seeds.get(source, NO_TARGETS)
+
+    def __contains__(self, action: Action) -> bool:
+        kind = action[0]
+        if kind == "GROW":
+            return action[1] in self.grow
+        if kind == "SEED":
+            return action[2] in self.targets(action[1])
+        if kind == "COMPLETE":
+            return action[1] in self.complete
+        return kind == "WAIT"
+
+    def actions(self) -> List[Action]:
+        """every legal action, WAIT first"""
+        output = [WAIT]
+        output += [("COMPLETE", cell) for cell in self.complete]
+        output += [("GROW", cell) for cell in self.grow]
+        for source, targets in self.seeds.items():
+            output += [("SEED", source, target) for target in targets]
+        return output
+
+    def __len__(self) -> int:
+        return 1 + len(self.complete) + len(self.grow) + sum(map(len, self.seeds.values()))
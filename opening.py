@@ -0,0 +1,113 @@
+import os
+import hashlib
+from typing import List, Optional, Tuple
+
+from bitboard import State
+from simulation import WAIT, Action, Simulator, format_action, parse_action
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening.book")
+BOOK_TEXT = None  # the book itself, embedded by bundle.py where files can't be read
+OPENING_DAYS = 6  # days covered by the book
+# the book moves did no better than the search of a turn on maps outside
+# the book's sample (50-50 for kalioz, 47-53 for klemek), so the bots only
+# play them when asked to
+USE_BOOK = False
+
+
+def symmetries(neighbors: List[List[int]]) -> List[List[int]]:
+    """the 6 rotations and 6 reflections of the board, as cell -> image lists"""
+    output = []
+    for reflect in (False, True):
+        for turn in range(6):
+            image = [-1] * len(neighbors)
+            image[0] = 0
+            queue = [0]
+            for cell in queue:
+                for direction, neighbor in enumerate(neighbors[cell]):
+                    if neighbor < 0 or image[neighbor] >= 0:
+                        continue
+                    moved = (turn - direction) % 6 if reflect else (turn + direction) % 6
+                    image[neighbor] = neighbors[image[cell]][moved]
+                    queue.append(neighbor)
+            output.append(image)
+    return output
+
+
+def canonical(neighbors: List[List[int]], richness: List[int], state: State) -> Tuple[str, List[int]]:
+    """hash of the map and trees, the same for every symmetry of them, and the cell -> canonical cell map"""
+    cells = [
+        f"{richness[cell]}{state.size(cell)}{'m' if state.is_mine(cell) else 'o'}"
+        if state.has_tree(cell) else f"{richness[cell]}-"
+        for cell in range(len(richness))
+    ]
+    best, best_image = None, None
+    for image in symmetries(neighbors):
+        layout = [""] * len(cells)
+        for cell, code in enumerate(cells):
+            layout[image[cell]] = code
+        layout = " ".join(layout)
+        if best is None or layout < best:
+            best, best_image = layout, image
+    return hashlib.sha1(best.encode()).hexdigest()[:16], best_image
+
+
+def map_action(action: Action, image: List[int]) -> Action:
+    return (action[0], *(image[cell] for cell in action[1:]))
+
+
+def format_entry(key: str, days: List[List[Action]]) -> str:
+    return key + " " + "|".join(",".join(format_action(action) for action in day) for day in days)
+
+
+def read_entry(key: str, path: str = BOOK_PATH) -> Optional[List[List[Action]]]:
+    """actions of each day stored for the key, only that line of the book is parsed"""
+    line = None
+    if BOOK_TEXT is not None:
+        text = "\n" + BOOK_TEXT + "\n"
+        start = text.find("\n" + key + " ")
+        if start >= 0:
+            line = text[start + 1:text.find("\n", start + 1)]
+    elif os.path.exists(path):
+        with open(path) as book:
+            line = next((line for line in book if line.startswith(key + " ")), None)
+    if line is None:
+        return None
+    days = line.strip().split(" ", 1)[1].split("|")
+    return [[parse_action(action) for action in day.split(",") if action] for day in days]
+
+
+class Opening:
+    """book actions of the current map, played while they stay legal"""
+
+    def __init__(self, days: List[List[Action]]):
+        self.days = days
+        self.day = -1
+        self.index = 0
+
+    @classmethod
+    def load(cls, neighbors: List[List[int]], richness: List[int], state: State,
+             path: str = BOOK_PATH) -> Optional["Opening"]:
+        key, image = canonical(neighbors, richness, state)
+        days = read_entry(key, path)
+        if days is None:
+            return None
+        inverse = [0] * len(image)
+        for cell, target in enumerate(image):
+            inverse[target] = cell
+        return cls([[map_action(action, inverse) for action in day] for day in days])
+
+    def next_action(self, state: State, simulator: Simulator) -> Optional[Action]:
+        """the book action for this frame, None once out of the book"""
+        if state.day >= len(self.days):
+            return None
+        if state.day != self.day:
+            self.day, self.index = state.day, 0
+        actions = self.days[state.day]
+        if self.index >= len(actions):
+            return WAIT
+        action = actions[self.index]
+        if not simulator.is_legal(state, action):
+            self.days = []  # the game left the book
+            return None
+        self.index += 1
+        return action
@@ -0,0 +1,100 @@
+import time
+from typing import Callable, List, Optional
+
+from bitboard import State
+from simulation import WAIT, Action, Simulator
+
+Policy = Callable[[State], Action]
+
+MAX_ACTIONS = 40  # actions planned in a day, a policy that never waits is cut there
+PLAN_TIME = 0.04  # planning time in a frame, the rest of the day is planned on the next frames
+ORDER = {"COMPLETE": 0, "GROW": 1, "SEED": 2}
+
+
+def order(action: Action, state: State) -> tuple:
+    """cheapest order of the actions of a day
+
+    a COMPLETE lowers the count of grown trees, a GROW lowers the count of
+    the size it leaves and a SEED raises the count of seeds: completing
+    first, then growing the biggest trees first, then seeding costs the
+    least for the same actions.
+    """
+    kind = action[0]
+    return (ORDER[kind], -state.size(action[1]) if kind == "GROW" else 0)
+
+
+class DayPlanner:
+    """actions of the whole day, planned on its first frame
+
+    the policy is played on the predicted states until it waits, then the
+    same actions are put in their cheapest order, the policy spending the
+    sun saved this way. the next frames play the plan as long as our trees,
+    sun and score are the ones predicted: the opponent moves aren't, they
+    only make us plan again when the next action becomes illegal.
+    """
+
+    def __init__(self, simulator: Simulator, policy: Policy):
+        self.simulator = simulator
+        self.policy = policy
+        self.actions: List[Action] = []
+        self.states: List[State] = []  # predicted state before each action
+        self.index = 0
+        self.plans = 0
+
+    def greedy(self, state: State, deadline: float) -> List[Action]:
+        """actions of the policy until it waits, or until the deadline"""
+        actions = []
+        while len(actions) < MAX_ACTIONS:
+            action = self.policy(state)
+            if action[0] == "WAIT" or not self.simulator.is_legal(state, action):
+                actions.append(WAIT)
+                break
+            actions.append(action)
+            state = self.simulator.play(state, action)
+            if time.perf_counter() > deadline:
+                break
+        return actions
+
+    def unroll(self, state: State, actions: List[Action]) -> Optional[List[State]]:
+        """state before each action and after the last one, None if one is illegal"""
+        states = [state]
+        for action in actions:
+            if not self.simulator.is_legal(state, action):
+                return None
+            state = self.simulator.play(state, action)
+            states.append(state)
+        return states
+
+    def plan(self, state: State, deadline: float):
+        actions = self.greedy(state, deadline)
+        moves = [action for action in actions if action[0] != "WAIT"]
+        ordered = sorted(moves, key=lambda action: order(action, state))
+        if ordered != moves and time.perf_counter() < deadline:
+            greedy_states = self.unroll(state, moves)
+            ordered_states = self.unroll(state, ordered)
+            if ordered_states is not None and ordered_states[-1].sun > greedy_states[-1].sun:
+                actions = ordered + self.greedy(ordered_states[-1], deadline)
+        self.actions = actions
+        self.states = self.unroll(state, actions)[:-1]
+        self.index = 0
+        self.plans += 1
+
+    def expected(self, state: State) -> bool:
+        """whether our part of the state is the one predicted for the next action"""
+        if self.index >= len(self.actions):
+            return False
+        predicted = self.states[self.index]
+        return (state.day == predicted.day and state.sun == predicted.sun and
+                state.score == predicted.score and state.mine == predicted.mine and
+                all(state.sizes[size] & state.mine == predicted.sizes[size] & predicted.mine
+                    for size in range(4)) and
+                state.dormant & state.mine == predicted.dormant & predicted.mine and
+                self.simulator.is_legal(state, self.actions[self.index]))
+
+    def next_action(self, state: State, deadline: float) -> Action:
+        """action of the plan for this frame, planning the rest of the day again if needed"""
+        if not self.expected(state):
+            self.plan(state, deadline)
+        action = self.actions[self.index]
+        self.index += 1
+        return action
@@ -0,0 +1,90 @@
+import sys
+import select
+from typing import BinaryIO, List, Tuple
+
+CHUNK = 1 << 16
+
+CellRow = Tuple[int, int, int, int, int, int, int, int]  # index, richness, 6 neighbors
+TreeRow = Tuple[int, int, int, int]  # cell, size, is_mine, is_dormant
+
+
+class Frame:
+    """inputs of one turn, the legal moves kept as read for moves.LegalMoves to parse on demand"""
+    __slots__ = ("day", "nutrients", "sun", "score", "opp_sun", "opp_score",
+                 "opp_is_waiting", "trees", "raw_moves")
+
+    def __init__(self, day: int, nutrients: int, sun: int, score: int, opp_sun: int,
+                 opp_score: int, opp_is_waiting: bool, trees: List[TreeRow], raw_moves: bytes):
+        self.day = day
+        self.nutrients = nutrients
+        self.sun = sun
+        self.score = score
+        self.opp_sun = opp_sun
+        self.opp_score = opp_score
+        self.opp_is_waiting = opp_is_waiting
+        self.trees = trees
+        self.raw_moves = raw_moves
+
+
+class Reader:
+    """reads the protocol from stdin in as few reads as possible"""
+
+    def __init__(self, stream: BinaryIO = None):
+        self.stream = stream if stream is not None else sys.stdin.buffer
+        self.data = b""
+        self.pos = 0
+
+    def feed(self, data: bytes):
+        """add data as if it came from the stream"""
+        self.data = self.data[self.pos:] + data
+        self.pos = 0
+
+    def ready(self) -> bool:
+        """whether the next frame has started to come, reading it wouldn't wait"""
+        if self.pos < len(self.data):
+            return True
+        try:
+            return len(select.select([self.stream], [], [], 0)[0]) > 0
+        except (OSError, ValueError, AttributeError):
+            # not a pipe or a file, nothing can tell if reading would wait
+            return True
+
+    def fill(self):
+        # read1 returns what is available instead of waiting for a full chunk
+        chunk = self.stream.read1(CHUNK)
+        if len(chunk) == 0:
+            raise EOFError("end of the protocol stream")
+        self.data += chunk
+
+    def lines(self, count: int) -> bytes:
+        """the next `count` lines as one block"""
+        start = end = self.pos
+        for _ in range(count):
+            newline = self.data.find(b"\n", end)
+            while newline < 0:
+                self.fill()
+                newline = self.data.find(b"\n", end)
+            end = newline + 1
+        self.pos = end
+        return self.data[start:end]
+
+    def read_cells(self) -> List[CellRow]:
+        values = map(int, self.lines(int(self.lines(1))).split())
+        return list(zip(*[values] * 8))
+
+    def read_frame(self) -> Frame:
+        if self.pos > 0:
+            self.data = self.data[self.pos:]
+            self.pos = 0
+        day, nutrients, sun, score, opp_sun, opp_score, opp_is_waiting = map(
+            int, self.lines(4).split())
+        values = map(int, self.lines(int(self.lines(1))).split())
+        trees = list(zip(values, values, values, values))
+        raw_moves = self.lines(int(self.lines(1)))
+        return Frame(day, nutrients, sun, score, opp_sun, opp_score,
+                     opp_is_waiting == 1, trees, raw_moves)
+
+
+def encode(lines: List[str]) -> bytes:
+    """protocol lines to the bytes a bot reads"""
+    return ("\n".join(lines) + "\n").encode()
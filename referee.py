@@ -0,0 +1,314 @@
+import random
+from typing import Dict, List, Optional, Tuple
+
+# Spring Challenge 2021 rules, see the CodinGame statement and referee
+
+MAX_DAY = 23
+CELL_COUNT = 37
+RING_COUNT = 3
+
+START_NUTRIENTS = 20
+START_TREES = 2
+START_TREE_DISTANCE = 2
+MAX_EMPTY_CELLS = 10
+
+COMPLETE_COST = 4
+GROW_BASE_COST = [1, 3, 7]
+RICHNESS_BONUS = [0, 0, 2, 4]
+
+DIRECTIONS = [(1, -1, 0), (1, 0, -1), (0, 1, -1),
+              (-1, 1, 0), (-1, 0, 1), (0, -1, 1)]
+
+
+def cube_neighbor(coord: Tuple[int, int, int], direction: int) -> Tuple[int, int, int]:
+    dx, dy, dz = DIRECTIONS[direction]
+    return coord[0] + dx, coord[1] + dy, coord[2] + dz
+
+
+def cube_distance(a: Tuple[int, int, int], b: Tuple[int, int, int]) -> int:
+    return (abs(a[0] - b[0]) + abs(a[1] - b[1]) + abs(a[2] - b[2])) // 2
+
+
+class Board:
+    def __init__(self, rng: random.Random = None):
+        rng = rng if rng is not None else random.Random()
+        self.coords = [(0, 0, 0)]
+        self.richness = [3]
+        coord = cube_neighbor((0, 0, 0), 0)
+        for distance in range(1, RING_COUNT + 1):
+            for orientation in range(6):
+                for _ in range(distance):
+                    self.coords.append(coord)
+                    self.richness.append(3 if distance < RING_COUNT - 1 else
+                                         2 if distance == RING_COUNT - 1 else 1)
+                    coord = cube_neighbor(coord, (orientation + 2) % 6)
+            coord = cube_neighbor(coord, 0)
+        self.index = {coord: i for i, coord in enumerate(self.coords)}
+        self.neighbors = [
+            [self.index.get(cube_neighbor(coord, d), -1) for d in range(6)]
+            for coord in self.coords
+        ]
+        self.opposite = [self.index[(-x, -y, -z)] for x, y, z in self.coords]
+        # in_range[cell][size] = other cells at a distance up to size, in order
+        self.in_range = [
+            [[other for other in range(CELL_COUNT)
+              if 0 < cube_distance(coord, self.coords[other]) <= size]
+             for size in range(RING_COUNT + 1)]
+            for coord in self.coords
+        ]
+        self.dig_holes(rng)
+
+    def dig_holes(self, rng: random.Random):
+        wanted = rng.randrange(MAX_EMPTY_CELLS + 1)
+        dug = 0
+        while dug < wanted - 1:
+            cell = rng.randrange(CELL_COUNT)
+            if self.richness[cell] != 0:
+                self.richness[cell] = 0
+                dug += 1
+                if self.opposite[cell] != cell:
+                    self.richness[self.opposite[cell]] = 0
+                    dug += 1
+
+    def distance(self, a: int, b: int) -> int:
+        return cube_distance(self.coords[a], self.coords[b])
+
+    def lines(self) -> List[str]:
+        return [str(CELL_COUNT)] + [
+            f"{i} {self.richness[i]} {' '.join(map(str, self.neighbors[i]))}"
+            for i in range(CELL_COUNT)
+        ]
+
+
+class Referee:
+    def __init__(self, seed: int = None, board: Board = None):
+        self.rng = random.Random(seed)
+        self.board = board if board is not None else Board(self.rng)
+        self.day = 0
+        self.nutrients = START_NUTRIENTS
+        self.sun = [0, 0]
+        self.score = [0, 0]
+        self.waiting = [False, False]
+        self.invalid = [0, 0]
+        # per cell, -1 when there is no tree
+        self.size = [-1] * CELL_COUNT
+        self.owner = [-1] * CELL_COUNT
+        self.dormant = [False] * CELL_COUNT
+        self.place_starting_trees()
+        self.gather_sun()
+
+    def place_starting_trees(self):
+        board = self.board
+        outer = [
+            cell for cell in range(CELL_COUNT)
+            if cube_distance(board.coords[cell], (0, 0, 0)) == RING_COUNT and
+            board.richness[cell] > 0
+        ]
+        chosen = []
+        while len(chosen) < 2 * START_TREES:
+            chosen = []
+            available = list(outer)
+            for _ in range(START_TREES):
+                if len(available) == 0:
+                    break
+                cell = available[self.rng.randrange(len(available))]
+                opposite = board.opposite[cell]
+                available = [
+                    other for other in available
+                    if board.distance(other, cell) > START_TREE_DISTANCE and
+                    board.distance(other, opposite) > START_TREE_DISTANCE
+                ]
+                chosen += [cell, opposite]
+        for i, cell in enumerate(chosen):
+            self.size[cell] = 1
+            self.owner[cell] = i % 2
+
+    # RULES
+
+    def tree_count(self, player: int, size: int) -> int:
+        return sum(1 for cell in range(CELL_COUNT)
+                   if self.owner[cell] == player and self.size[cell] == size)
+
+    def grow_cost(self, player: int, cell: int) -> int:
+        size = self.size[cell]
+        return GROW_BASE_COST[size] + self.tree_count(player, size + 1)
+
+    def seed_cost(self, player: int) -> int:
+        return self.tree_count(player, 0)
+
+    def shadow(self, sun_dir: int) -> List[int]:
+        """largest size of the trees casting a shadow on each cell"""
+        output = [0] * CELL_COUNT
+        for cell in range(CELL_COUNT):
+            size = self.size[cell]
+            target = cell
+            for _ in range(size):
+                target = self.board.neighbors[target][sun_dir]
+                if target < 0:
+                    break
+                output[target] = max(output[target], size)
+        return output
+
+    def gather_sun(self):
+        shadow = self.shadow(self.day % 6)
+        for cell in range(CELL_COUNT):
+            if self.size[cell] > shadow[cell]:
+                self.sun[self.owner[cell]] += self.size[cell]
+
+    def can_seed(self, player: int, source: int, target: int) -> bool:
+        return (
+            0 <= source < CELL_COUNT and 0 <= target < CELL_COUNT and
+            self.owner[source] == player and
+            not self.dormant[source] and
+            self.size[source] > 0 and
+            self.size[target] < 0 and
+            self.board.richness[target] > 0 and
+            self.board.distance(source, target) <= self.size[source] and
+            self.seed_cost(player) <= self.sun[player]
+        )
+
+    def can_grow(self, player: int, cell: int) -> bool:
+        return (
+            0 <= cell < CELL_COUNT and
+            self.owner[cell] == player and
+            not self.dormant[cell] and
+            0 <= self.size[cell] < 3 and
+            self.grow_cost(player, cell) <= self.sun[player]
+        )
+
+    def can_complete(self, player: int, cell: int) -> bool:
+        return (
+            0 <= cell < CELL_COUNT and
+            self.owner[cell] == player and
+            not self.dormant[cell] and
+            self.size[cell] == 3 and
+            COMPLETE_COST <= self.sun[player]
+        )
+
+    def possible_moves(self, player: int) -> List[str]:
+        # same checks as can_complete, can_grow and can_seed, the counts taken once
+        counts = [self.tree_count(player, size) for size in range(4)]
+        sun = self.sun[player]
+        active = [cell for cell in range(CELL_COUNT)
+                  if self.owner[cell] == player and not self.dormant[cell]]
+        moves = ["WAIT"]
+        for cell in active:
+            size = self.size[cell]
+            if size == 3:
+                if COMPLETE_COST <= sun:
+                    moves.append(f"COMPLETE {cell}")
+            elif GROW_BASE_COST[size] + counts[size + 1] <= sun:
+                moves.append(f"GROW {cell}")
+        if counts[0] <= sun:
+            richness = self.board.richness
+            for source in active:
+                for target in self.board.in_range[source][self.size[source]]:
+                    if self.size[target] < 0 and richness[target] > 0:
+                        moves.append(f"SEED {source} {target}")
+        return moves
+
+    def parse(self, player: int, action: str) -> Optional[Tuple[int, ...]]:
+        """action string to (kind, *cells), None if it is a WAIT or invalid"""
+        args = action.split()
+        try:
+            if args[0] == "WAIT":
+                return None
+            elif args[0] == "COMPLETE" and self.can_complete(player, int(args[1])):
+                return 0, int(args[1])
+            elif args[0] == "GROW" and self.can_grow(player, int(args[1])):
+                return 1, int(args[1])
+            elif args[0] == "SEED" and self.can_seed(player, int(args[1]), int(args[2])):
+                return 2, int(args[1]), int(args[2])
+        except (IndexError, ValueError):
+            pass
+        self.invalid[player] += 1
+        return None
+
+    def play(self, actions: Dict[int, str]):
+        """apply the actions of the active players for one frame"""
+        parsed = {}
+        for player, action in actions.items():
+            if self.waiting[player]:
+                continue
+            move = self.parse(player, action)
+            if move is None:
+                self.waiting[player] = True
+            else:
+                parsed[player] = move
+
+        seeds = [move[2] for move in parsed.values() if move[0] == 2]
+        completed = 0
+        for player, move in parsed.items():
+            cell = move[1]
+            if move[0] == 0:
+                self.sun[player] -= COMPLETE_COST
+                self.score[player] += self.nutrients + \
+                    RICHNESS_BONUS[self.board.richness[cell]]
+                self.size[cell] = -1
+                self.owner[cell] = -1
+                self.dormant[cell] = False
+                completed += 1
+            elif move[0] == 1:
+                self.sun[player] -= self.grow_cost(player, cell)
+                self.size[cell] += 1
+                self.dormant[cell] = True
+            else:
+                target = move[2]
+                self.dormant[cell] = True
+                if seeds.count(target) > 1:
+                    continue  # both players seeded the same cell, refunded
+                self.sun[player] -= self.seed_cost(player)
+                self.size[target] = 0
+                self.owner[target] = player
+                self.dormant[target] = True
+        self.nutrients = max(0, self.nutrients - completed)
+
+        if all(self.waiting):
+            self.new_day()
+
+    def new_day(self):
+        self.day += 1
+        if self.day > MAX_DAY:
+            return
+        self.waiting = [False, False]
+        self.dormant = [False] * CELL_COUNT
+        self.gather_sun()
+
+    @property
+    def over(self) -> bool:
+        return self.day > MAX_DAY
+
+    def active_players(self) -> List[int]:
+        return [player for player in range(2) if not self.waiting[player]]
+
+    def final_scores(self) -> List[int]:
+        return [self.score[player] + self.sun[player] // 3 for player in range(2)]
+
+    def winner(self) -> int:
+        """0 or 1, -1 for a draw. ties are broken by the number of trees"""
+        scores = self.final_scores()
+        if scores[0] == scores[1]:
+            scores = [self.owner.count(player) for player in range(2)]
+        if scores[0] == scores[1]:
+            return -1
+        return 0 if scores[0] > scores[1] else 1
+
+    # PROTOCOL
+
+    def frame_lines(self, player: int) -> List[str]:
+        opp = 1 - player
+        trees = [
+            f"{cell} {self.size[cell]} {int(self.owner[cell] == player)} {int(self.dormant[cell])}"
+            for cell in range(CELL_COUNT) if self.size[cell] >= 0
+        ]
+        moves = self.possible_moves(player)
+        return [
+            str(self.day),
+            str(self.nutrients),
+            f"{self.sun[player]} {self.score[player]}",
+            f"{self.sun[opp]} {self.score[opp]} {int(self.waiting[opp])}",
+            str(len(trees)),
+            *trees,
+            str(len(moves)),
+            *moves,
+        ]
@@ -0,0 +1,112 @@
+import mmap
+import struct
+from typing import Iterator, List, NamedTuple
+
+import numpy as np
+
+from bitboard import CELL_COUNT, State
+from simulation import WAIT, Action
+
+# one fixed-width little-endian record per turn:
+# richness of each cell, day, nutrients, sun, score, opp_sun, opp_score,
+# opp_is_waiting, the 4 size masks, mine, opp, dormant masks,
+# the action (kind, source, target) and the outcome of the game
+RECORD = struct.Struct(f"<{CELL_COUNT}sBBHHHHB7QBbbb")
+DTYPE = np.dtype([
+    ("richness", "u1", CELL_COUNT),
+    ("day", "u1"),
+    ("nutrients", "u1"),
+    ("sun", "<u2"),
+    ("score", "<u2"),
+    ("opp_sun", "<u2"),
+    ("opp_score", "<u2"),
+    ("opp_is_waiting", "u1"),
+    ("sizes", "<u8", 4),
+    ("mine", "<u8"),
+    ("opp", "<u8"),
+    ("dormant", "<u8"),
+    ("kind", "u1"),
+    ("source", "i1"),
+    ("target", "i1"),
+    ("outcome", "i1"),
+])
+assert DTYPE.itemsize == RECORD.size
+
+KINDS = ("WAIT", "COMPLETE", "GROW", "SEED")
+OUTCOME = RECORD.size - 1  # offset of the outcome in a record
+
+
+class Record(NamedTuple):
+    richness: List[int]
+    state: State
+    action: Action
+    outcome: int  # 1 won, -1 lost, 0 draw or unknown
+
+
+def pack(richness: bytes, state: State, action: Action, outcome: int = 0) -> bytes:
+    cells = (*action[1:], -1, -1)
+    return RECORD.pack(
+        richness, state.day, state.nutrients, state.sun, state.score,
+        state.opp_sun, state.opp_score, state.opp_is_waiting,
+        *state.sizes, state.mine, state.opp, state.dormant,
+        KINDS.index(action[0]), cells[0], cells[1], outcome)
+
+
+def unpack(data: bytes, offset: int = 0) -> Record:
+    values = RECORD.unpack_from(data, offset)
+    state = State()
+    (state.day, state.nutrients, state.sun, state.score, state.opp_sun,
+     state.opp_score, opp_is_waiting) = values[1:8]
+    state.opp_is_waiting = opp_is_waiting == 1
+    state.sizes = list(values[8:12])
+    state.mine, state.opp, state.dormant = values[12:15]
+    state.rehash()
+    kind, source, target, outcome = values[15:]
+    action = (KINDS[kind], source, target)[:1 + (kind > 0) + (kind == 3)]
+    return Record(list(values[0]), state, action, outcome)
+
+
+class Writer:
+    """appends the turns of a game to a replay file once its outcome is known"""
+
+    def __init__(self, path: str):
+        self.file = open(path, "ab")
+        self.pending = bytearray()
+
+    def record(self, richness: List[int], state: State, action: Action):
+        self.pending += pack(bytes(richness), state, action)
+
+    def end_game(self, outcome: int = 0):
+        for offset in range(OUTCOME, len(self.pending), RECORD.size):
+            self.pending[offset] = outcome & 0xFF
+        self.file.write(self.pending)
+        self.pending = bytearray()
+
+    def close(self):
+        self.file.close()
+
+
+class Corpus:
+    """records of a replay file, memory-mapped and decoded on access"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as source:
+            size = source.seek(0, 2)
+            self.data = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) if size > 0 else b""
+        self.count = len(self.data) // RECORD.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> Record:
+        if not -self.count <= index < self.count:
+            raise IndexError(index)
+        return unpack(self.data, (index % self.count) * RECORD.size)
+
+    def __iter__(self) -> Iterator[Record]:
+        for offset in range(0, self.count * RECORD.size, RECORD.size):
+            yield unpack(self.data, offset)
+
+    def array(self) -> np.ndarray:
+        """every record as a structured array sharing the mapped memory"""
+        return np.frombuffer(self.data, DTYPE, self.count)
@@ -0,0 +1,300 @@
+import random
+from typing import Callable, List, Optional, Tuple
+
+from bitboard import State, bits, popcount
+from simulation import COMPLETE_COST, MAX_DAY, WAIT, Action, Simulator
+
+GROW_BASE_COST = [1, 3, 7]
+MAX_DAY_ACTIONS = 4  # actions of a player in a day of playout, the policy waits after
+EPSILON = 0.1  # part of the playout actions sampled at random among the legal ones
+
+# cheap greedy policy of the playouts, in mask operations. it only follows the
+# order of the bots' greedy (complete, seed, grow): it seeds on the richest free
+# cell in reach and grows the biggest tree, with no shadow scoring
+COMPLETE_DAY = 11  # first day a grown tree can be completed
+GREEDY_MIN_GROWN = 3  # grown trees kept before the last day
+GREEDY_MAX_TREES = 9
+LAST_SEED_DAY = MAX_DAY - 2
+
+
+class Playout:
+    """compact state of a playout, changed in place
+
+    the players are indexed 1 for us and 0 for the opponent, as in
+    `owned[is_mine]`.
+    """
+    __slots__ = ("day", "nutrients", "sun", "score", "owned", "sizes", "dormant", "waiting")
+
+    def __init__(self, day: int, nutrients: int, sun: List[int], score: List[int],
+                 owned: List[int], sizes: List[int], dormant: int, waiting: List[bool]):
+        self.day = day
+        self.nutrients = nutrients
+        self.sun = sun
+        self.score = score
+        self.owned = owned
+        self.sizes = sizes
+        self.dormant = dormant
+        self.waiting = waiting
+
+    @classmethod
+    def from_state(cls, state: State) -> "Playout":
+        return cls(state.day, state.nutrients, [state.opp_sun, state.sun],
+                   [state.opp_score, state.score], [state.opp, state.mine], state.sizes[:],
+                   state.dormant, [state.opp_is_waiting, False])
+
+    def size(self, cell: int) -> int:
+        for size in range(4):
+            if self.sizes[size] >> cell & 1:
+                return size
+        return -1
+
+    def to_state(self) -> State:
+        """the bitboard state of the playout, for the evaluation of the simulator"""
+        state = State()
+        state.sizes = self.sizes[:]
+        state.opp, state.mine = self.owned
+        state.dormant = self.dormant
+        state.rehash()
+        state.day, state.nutrients = self.day, self.nutrients
+        state.opp_sun, state.sun = self.sun
+        state.opp_score, state.score = self.score
+        state.opp_is_waiting = self.waiting[0]
+        return state
+
+
+PlayoutPolicy = Callable[[Playout, int], Action]
+
+
+class Rollout:
+    """playouts of the coming days, both players moving
+
+    each day, we then the opponent play the policy until it waits, then
+    the sun is gathered through the ray masks of the geometry. the moves
+    of a day are played in turn rather than at once, so two seeds on the
+    same cell or two completions in the same frame are approximated.
+    """
+
+    def __init__(self, simulator: Simulator, policy: Optional[PlayoutPolicy] = None,
+                 epsilon: float = EPSILON, seed: Optional[int] = None):
+        self.simulator = simulator
+        self.policy = policy if policy is not None else self.greedy
+        self.epsilon = epsilon
+        self.random = random.Random(seed)
+        geometry = simulator.geometry
+        # cell masks unioned over a whole mask of trees, see spread
+        self.shade = [[None] + [chunked([cell_rays[size] for cell_rays in rays]) for size in range(1, 4)]
+                      for rays in geometry.rays]
+        count = geometry.cell_count
+        self.reach = [None] + [chunked([geometry.range_masks[cell * 4 + size] for cell in range(count)])
+                               for size in range(1, 4)]
+        self.range_masks = geometry.range_masks
+        self.bonus = simulator.bonus
+        self.soil = simulator.usable
+        # cells of each richness, the richest first
+        self.richness_masks = [
+            sum(1 << cell for cell, value in enumerate(simulator.richness) if value == richness)
+            for richness in (3, 2, 1)
+        ]
+
+    # RULES
+
+    def grow_cost(self, playout: Playout, player: int, size: int) -> int:
+        return GROW_BASE_COST[size] + popcount(playout.owned[player] & playout.sizes[size + 1])
+
+    def seed_cost(self, playout: Playout, player: int) -> int:
+        return popcount(playout.owned[player] & playout.sizes[0])
+
+    def is_legal(self, playout: Playout, player: int, action: Action) -> bool:
+        kind = action[0]
+        if kind == "WAIT":
+            return True
+        source = action[1]
+        if not (playout.owned[player] & ~playout.dormant) >> source & 1:
+            return False
+        size = playout.size(source)
+        if kind == "COMPLETE":
+            return size == 3 and playout.sun[player] >= COMPLETE_COST
+        if kind == "GROW":
+            return size < 3 and self.grow_cost(playout, player, size) <= playout.sun[player]
+        free = self.soil & ~(playout.owned[0] | playout.owned[1])
+        return (size > 0 and self.seed_cost(playout, player) <= playout.sun[player] and
+                (self.range_masks[source * 4 + size] & free) >> action[2] & 1 == 1)
+
+    def apply(self, playout: Playout, player: int, action: Action):
+        kind = action[0]
+        cell = action[1]
+        if kind == "GROW":
+            size = playout.size(cell)
+            playout.sun[player] -= self.grow_cost(playout, player, size)
+            playout.sizes[size] ^= 1 << cell
+            playout.sizes[size + 1] |= 1 << cell
+            playout.dormant |= 1 << cell
+        elif kind == "SEED":
+            target = action[2]
+            playout.sun[player] -= self.seed_cost(playout, player)
+            playout.sizes[0] |= 1 << target
+            playout.owned[player] |= 1 << target
+            playout.dormant |= 1 << cell | 1 << target
+        else:
+            playout.sun[player] -= COMPLETE_COST
+            playout.score[player] += playout.nutrients + self.bonus[cell]
+            playout.nutrients = max(0, playout.nutrients - 1)
+            playout.sizes[3] ^= 1 << cell
+            playout.owned[player] ^= 1 << cell
+
+    def end_day(self, playout: Playout):
+        playout.day += 1
+        playout.dormant = 0
+        playout.waiting = [False, False]
+        if playout.day > MAX_DAY:
+            return
+        tables = self.shade[playout.day % 6]
+        sizes = playout.sizes
+        # shade of the trees of at least each size, a tree is spooked by the shade of its size
+        shade = 0
+        producing = [0, 0, 0, 0]
+        for size in (3, 2, 1):
+            shade |= spread(tables[size], sizes[size])
+            producing[size] = sizes[size] & ~shade
+        sun = playout.sun
+        for player, owned in enumerate(playout.owned):
+            sun[player] += (popcount(owned & producing[1]) + 2 * popcount(owned & producing[2]) +
+                            3 * popcount(owned & producing[3]))
+
+    # POLICIES
+
+    def sample(self, playout: Playout, player: int, rng: Optional[random.Random] = None) -> Action:
+        """one of the legal actions of the player, WAIT included, all equally likely
+
+        drawn from `rng` if given, else from the random of the playouts
+        """
+        owned = playout.owned[player]
+        active = owned & ~playout.dormant
+        sun = playout.sun[player]
+        sizes = playout.sizes
+        complete = active & sizes[3] if sun >= COMPLETE_COST else 0
+        grow = 0
+        for size in range(3):
+            if self.grow_cost(playout, player, size) <= sun:
+                grow |= active & sizes[size]
+        seeds: List[Tuple[int, int]] = []  # (source, targets mask)
+        seed_count = 0
+        if self.seed_cost(playout, player) <= sun:
+            free = self.soil & ~(playout.owned[0] | playout.owned[1])
+            for size in range(1, 4):
+                for source in bits(active & sizes[size]):
+                    targets = self.range_masks[source * 4 + size] & free
+                    if targets:
+                        seeds.append((source, targets))
+                        seed_count += popcount(targets)
+        complete_count, grow_count = popcount(complete), popcount(grow)
+        index = int((rng or self.random).random() * (1 + complete_count + grow_count + seed_count))
+        if index == 0:
+            return WAIT
+        index -= 1
+        if index < complete_count:
+            return "COMPLETE", nth_bit(complete, index)
+        index -= complete_count
+        if index < grow_count:
+            return "GROW", nth_bit(grow, index)
+        index -= grow_count
+        for source, targets in seeds:
+            count = popcount(targets)
+            if index < count:
+                return "SEED", source, nth_bit(targets, index)
+            index -= count
+        return WAIT
+
+    def pick(self, mask: int) -> int:
+        """a random cell among the richest of the mask"""
+        for richness_mask in self.richness_masks:
+            if mask & richness_mask:
+                mask &= richness_mask
+                break
+        return nth_bit(mask, int(self.random.random() * popcount(mask)))
+
+    def greedy(self, playout: Playout, player: int) -> Action:
+        """complete, seed while it is free, grow: an approximation of the greedy bots, see above"""
+        day = playout.day
+        if day == 0:
+            return WAIT
+        owned = playout.owned[player]
+        active = owned & ~playout.dormant
+        if not active:
+            return WAIT
+        sun = playout.sun[player]
+        sizes = playout.sizes
+        if day >= COMPLETE_DAY and sun >= COMPLETE_COST and active & sizes[3]:
+            if day >= MAX_DAY or popcount(owned & sizes[3]) > GREEDY_MIN_GROWN or \
+                    playout.score[player] <= playout.score[1 - player]:
+                return "COMPLETE", self.pick(active & sizes[3])
+        if day < LAST_SEED_DAY and not owned & sizes[0] and active & ~sizes[0] and \
+                popcount(owned) < GREEDY_MAX_TREES:
+            seed = self.seed(playout, player, active)
+            if seed is not None:
+                return seed
+        for size in range(2, max(0, 3 + day - MAX_DAY) - 1, -1):
+            growable = active & sizes[size]
+            if growable and GROW_BASE_COST[size] + popcount(owned & sizes[size + 1]) <= sun:
+                return "GROW", self.pick(growable)
+        return WAIT
+
+    def seed(self, playout: Playout, player: int, active: int) -> Optional[Action]:
+        """seed on the richest cell in reach, away from our trees if possible"""
+        owned = playout.owned[player]
+        sizes = playout.sizes
+        reach = 0
+        for size in range(1, 4):
+            reach |= spread(self.reach[size], active & sizes[size])
+        reach &= self.soil & ~(playout.owned[0] | playout.owned[1])
+        if reach == 0:
+            return None
+        target = self.pick(reach & ~spread(self.reach[1], owned) or reach)
+        for size in range(1, 4):
+            sources = self.range_masks[target * 4 + size] & active & sizes[size]
+            if sources:
+                return "SEED", (sources & -sources).bit_length() - 1, target
+        return None
+
+    # PLAYOUTS
+
+    def play_day(self, playout: Playout, player: int):
+        policy, sample, draw, epsilon = self.policy, self.sample, self.random.random, self.epsilon
+        for _ in range(MAX_DAY_ACTIONS):
+            action = sample(playout, player) if draw() < epsilon else policy(playout, player)
+            if action[0] == "WAIT":
+                break
+            self.apply(playout, player, action)
+        playout.waiting[player] = True
+
+
+def nth_bit(mask: int, index: int) -> int:
+    """index of the `index`-th set bit, lowest first"""
+    for _ in range(index):
+        mask &= mask - 1
+    return (mask & -mask).bit_length() - 1
+
+
+def chunked(masks: List[int]) -> List[List[int]]:
+    """union of the masks of the cells of each byte, for the 8 cells chunks of a mask"""
+    tables = []
+    for start in range(0, len(masks), 8):
+        chunk = masks[start:start + 8]
+        table = [0] * 256
+        for byte in range(1, 256):
+            low = byte & -byte
+            cell = low.bit_length() - 1
+            table[byte] = table[byte ^ low] | (chunk[cell] if cell < len(chunk) else 0)
+        tables.append(table)
+    return tables
+
+
+def spread(tables: List[List[int]], mask: int) -> int:
+    """union of the cell masks of the cells of the mask, a lookup per 8 cells"""
+    union = 0
+    for table in tables:
+        if not mask:
+            break
+        union |= table[mask & 255]
+        mask >>= 8
+    return union
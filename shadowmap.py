@@ -0,0 +1,55 @@
+import numpy as np
+
+from bitboard import State, bits
+from geometry import Geometry, MAX_SIZE
+
+
+class ShadowMap:
+    """shadow strength of every cell for the 6 sun directions, computed once per frame"""
+
+    def __init__(self, geometry: Geometry):
+        self.count = count = geometry.cell_count
+        # casters[sun_dir, distance - 1, cell] = cell shadowing `cell` from that distance,
+        # `count` (an always empty padding cell) when out of the map
+        casters = [[[count] * count for _ in range(MAX_SIZE)] for _ in range(6)]
+        for sun_dir in range(6):
+            for cell in range(count):
+                for distance, source in enumerate(geometry.shadow_sources(cell, sun_dir)):
+                    casters[sun_dir][distance][cell] = source
+        self.casters = np.array(casters, dtype=np.int64)
+        self.reach = np.arange(1, MAX_SIZE + 1).reshape(1, MAX_SIZE, 1)
+        # per cell and the padding cell, -1 when there is no tree
+        self.sizes = np.full(count + 1, -1, dtype=np.int64)
+        self.dormant = np.zeros(count + 1, dtype=np.int64)
+        # strength[sun_dir, cell] = largest size of the trees shadowing the cell, 0 if none
+        self.strength = np.zeros((6, count), dtype=np.int64)
+        self.table = self.strength.tolist()
+
+    def update(self, state: State):
+        sizes = [-1] * (self.count + 1)
+        for size, mask in enumerate(state.sizes):
+            for cell in bits(mask):
+                sizes[cell] = size
+        dormant = [0] * (self.count + 1)
+        for cell in bits(state.dormant):
+            dormant[cell] = 1
+        self.sizes = np.array(sizes, dtype=np.int64)
+        self.dormant = np.array(dormant, dtype=np.int64)
+        self.strength = self.cast(self.sizes[self.casters])
+        self.table = self.strength.tolist()
+
+    def cast(self, sizes: np.ndarray) -> np.ndarray:
+        """strength from the sizes of the casters, shaped (..., distance, cell)"""
+        return np.where(sizes >= self.reach, sizes, 0).max(axis=-2)
+
+    def shadowed(self, cell: int, sun_dir: int, size: int = 0) -> bool:
+        """whether a tree of `size` on the cell would be shadowed, any shadow for a seed"""
+        return self.table[sun_dir][cell] >= (size or 1)
+
+    def forecast(self, day: int, days: int = 6) -> np.ndarray:
+        """forecast[delta - 1, cell] = strength on day + delta if every tree grows once a day"""
+        deltas = np.arange(1, days + 1).reshape(days, 1)
+        sizes = np.where(self.sizes >= 0, np.minimum(self.sizes + deltas - self.dormant, MAX_SIZE), -1)
+        casters = self.casters[(day + deltas[:, 0]) % 6]
+        projected = np.take_along_axis(sizes, casters.reshape(days, -1), axis=1)
+        return self.cast(projected.reshape(casters.shape))
@@ -0,0 +1,130 @@
+from typing import List, Tuple
+
+from bitboard import State, bits, popcount
+from geometry import Geometry
+
+MAX_DAY = 23
+
+COMPLETE_COST = 4
+RICHNESS_BONUS = [0, 0, 2, 4]
+
+# ("WAIT",) / ("COMPLETE", cell) / ("GROW", cell) / ("SEED", source, target)
+Action = Tuple
+WAIT = ("WAIT",)
+
+# evaluation weights, tuned against the greedy bots in the arena
+TREE_BASIS = [0, 1, 4, 11]  # sun spent to get a tree of each size
+TREE_VALUE = [0, 0, 0.4, 0.8]  # part of its completion value a tree of each size is worth
+INCOME_DAYS = 3  # days of sun income forecast
+INCOME_WEIGHT = 12  # max number of days this forecast is projected on
+
+
+def parse_action(text: str) -> Action:
+    args = text.split()
+    if len(args) == 0 or args[0] not in ("COMPLETE", "GROW", "SEED"):
+        return WAIT
+    return (args[0], *map(int, args[1:]))
+
+
+def format_action(action: Action) -> str:
+    return " ".join(map(str, action))
+
+
+class Simulator:
+    """our own actions on a bitboard State, the opponent being asleep"""
+
+    def __init__(self, geometry: Geometry, richness: List[int]):
+        self.geometry = geometry
+        self.richness = richness
+        self.bonus = [RICHNESS_BONUS[value] for value in richness]
+        self.usable = sum(1 << cell for cell, value in enumerate(richness) if value > 0)
+
+    def actions(self, state: State) -> List[Action]:
+        """our legal actions, WAIT first"""
+        active = state.mine & ~state.dormant
+        output = [WAIT]
+        if state.sun >= COMPLETE_COST:
+            output += [("COMPLETE", cell) for cell in bits(active & state.sizes[3])]
+        for size in range(3):
+            if state.grow_cost(size) <= state.sun:
+                output += [("GROW", cell) for cell in bits(active & state.sizes[size])]
+        if state.seed_cost() <= state.sun:
+            free = self.usable & ~state.trees
+            for size in range(1, 4):
+                for source in bits(active & state.sizes[size]):
+                    targets = self.geometry.range_masks[source * 4 + size] & free
+                    output += [("SEED", source, target) for target in bits(targets)]
+        return output
+
+    def is_legal(self, state: State, action: Action) -> bool:
+        if action[0] == "WAIT":
+            return True
+        source = action[1]
+        if not (state.mine & ~state.dormant) >> source & 1:
+            return False
+        size = state.size(source)
+        if action[0] == "COMPLETE":
+            return size == 3 and state.sun >= COMPLETE_COST
+        if action[0] == "GROW":
+            return size < 3 and state.grow_cost(size) <= state.sun
+        target = action[2]
+        return (size > 0 and state.seed_cost() <= state.sun and
+                (self.geometry.range_masks[source * 4 + size] & self.usable & ~state.trees) >> target & 1 == 1)
+
+    def play(self, state: State, action: Action) -> State:
+        """state after one of our actions, a WAIT doesn't change it"""
+        state = state.copy()
+        kind = action[0]
+        if kind == "COMPLETE":
+            cell = action[1]
+            state.sun -= COMPLETE_COST
+            state.score += state.nutrients + self.bonus[cell]
+            state.nutrients = max(0, state.nutrients - 1)
+            state.remove(cell)
+        elif kind == "GROW":
+            cell = action[1]
+            state.sun -= state.grow_cost(state.size(cell))
+            state.grow(cell)
+            state.set_dormant(cell)
+        elif kind == "SEED":
+            state.sun -= state.seed_cost()
+            state.place(action[2], 0, True, True)
+            state.set_dormant(action[1])
+        return state
+
+    def income(self, state: State, day: int) -> Tuple[int, int]:
+        """sun gathered by (us, the opponent) on that day"""
+        producing = ~state.shadowed(state.shade(self.geometry.rays, day % 6))
+        mine = sum(size * popcount(state.sizes[size] & state.mine & producing) for size in range(1, 4))
+        opp = sum(size * popcount(state.sizes[size] & state.opp & producing) for size in range(1, 4))
+        return mine, opp
+
+    def end_day(self, state: State) -> State:
+        """the next day: the trees wake up and both players gather sun"""
+        state = state.copy()
+        state.day += 1
+        state.wake()
+        state.opp_is_waiting = False
+        if state.day <= MAX_DAY:
+            mine, opp = self.income(state, state.day)
+            state.sun += mine
+            state.opp_sun += opp
+        return state
+
+    def evaluate(self, state: State) -> float:
+        """estimated final score difference"""
+        days_left = MAX_DAY - state.day
+        value = state.score - state.opp_score + (state.sun - state.opp_sun) / 3
+        if days_left < 0:
+            return value
+        days = min(days_left, INCOME_DAYS)
+        for delta in range(1, days + 1):
+            mine, opp = self.income(state, state.day + delta)
+            value += (mine - opp) * min(days_left, INCOME_WEIGHT) / (3 * days)
+        for size in range(4):
+            for cell in bits(state.sizes[size]):
+                tree = TREE_BASIS[size] / 3
+                if size == 3 or days_left >= 3 - size:
+                    tree += TREE_VALUE[size] * (state.nutrients + self.bonus[cell])
+                value += tree if state.mine >> cell & 1 else -tree
+        return value
@@ -0,0 +1,14 @@
+import pytest
+
+import arena
+from referee import Referee
+
+
+@pytest.mark.parametrize("driver, searcher", [
+    (arena.KaliozBot, lambda bot: bot.forest),
+    (arena.KlemekBot, lambda bot: bot.game),
+])
+def test_drivers_take_the_search_time(driver, searcher):
+    lines = Referee(0).board.lines()
+    assert searcher(driver(lines, 0.02)).search_time == 0.02
+    assert searcher(driver(lines, 0)).search_time == 0
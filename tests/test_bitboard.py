@@ -0,0 +1,59 @@
+import random
+
+from bitboard import CELL_COUNT, State, popcount
+
+
+def random_state(rng: random.Random) -> State:
+    state = State()
+    for cell in rng.sample(range(CELL_COUNT), 12):
+        state.place(cell, rng.randrange(4), rng.random() < 0.5, rng.random() < 0.3)
+    state.day, state.nutrients = rng.randrange(24), rng.randrange(21)
+    state.sun, state.score = rng.randrange(100), rng.randrange(100)
+    return state
+
+
+def rehashed(state: State) -> int:
+    fresh = state.copy()
+    fresh.rehash()
+    return fresh.hash_key()
+
+
+def test_hash_kept_by_every_change():
+    rng = random.Random(0)
+    for _ in range(200):
+        state = random_state(rng)
+        assert state.hash_key() == rehashed(state)
+        for _ in range(20):
+            trees = [cell for cell in range(CELL_COUNT) if state.has_tree(cell)]
+            empty = [cell for cell in range(CELL_COUNT) if not state.has_tree(cell)]
+            change = rng.randrange(5)
+            if change == 0 and empty:
+                state.place(rng.choice(empty), 0, rng.random() < 0.5, True)
+            elif change == 1 and trees:
+                state.remove(rng.choice(trees))
+            elif change == 2 and trees:
+                cell = rng.choice(trees)
+                if state.size(cell) < 3:
+                    state.grow(cell)
+            elif change == 3 and trees:
+                state.set_dormant(rng.choice(trees))
+            else:
+                state.wake()
+            assert state.hash_key() == rehashed(state)
+
+
+def test_hash_follows_the_scalars():
+    state = random_state(random.Random(1))
+    other = state.copy()
+    assert other.hash_key() == state.hash_key()
+    other.sun += 1
+    assert other.hash_key() != state.hash_key()
+    other.sun -= 1
+    other.opp_is_waiting = not other.opp_is_waiting
+    assert other.hash_key() != state.hash_key()
+
+
+def test_popcount():
+    assert popcount(0) == 0
+    assert popcount((1 << CELL_COUNT) - 1) == CELL_COUNT
+    assert popcount(0b1011) == 3
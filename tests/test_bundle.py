@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+from bundle import bundle
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize("bot", ["kalioz.py", "klemek.py"])
+def test_bots_bundle_into_one_module(bot):
+    code = bundle(os.path.join(ROOT, bot))
+    compile(code, bot, "exec")
+    assert "\nimport rollout" not in code and "\nfrom rollout import" not in code
+
+
+def test_a_name_defined_by_two_modules_is_refused(tmp_path):
+    (tmp_path / "first.py").write_text("LIMIT = 3\n")
+    (tmp_path / "second.py").write_text("if True:\n    LIMIT = 9\n")
+    (tmp_path / "bot.py").write_text("from first import LIMIT\nimport second\n")
+    with pytest.raises(ValueError, match="LIMIT"):
+        bundle(str(tmp_path / "bot.py"))
@@ -0,0 +1,56 @@
+import random
+import time
+
+from bitboard import CELL_COUNT, State
+from endgame import Endgame
+from geometry import Geometry
+from referee import Referee
+from simulation import MAX_DAY, Simulator
+
+
+def brute_force(simulator: Simulator, state: State, known: dict) -> int:
+    """the endgame value, every action searched, the states known by all their fields"""
+    if state.day > MAX_DAY:
+        return 3 * state.score + state.sun
+    fields = (state.day, state.sun, state.score, state.nutrients, state.mine, state.opp,
+              state.dormant, *state.sizes)
+    if fields not in known:
+        known[fields] = max(
+            brute_force(simulator, simulator.end_day(state) if action[0] == "WAIT"
+                        else simulator.play(state, action), known)
+            for action in simulator.actions(state))
+    return known[fields]
+
+
+def small_state(rng: random.Random, soil) -> State:
+    state = State()
+    for cell in rng.sample(soil, rng.randint(2, 6)):
+        state.place(cell, rng.randint(0, 3), rng.random() < 0.5)
+    state.day = rng.randint(MAX_DAY - 2, MAX_DAY)
+    state.sun, state.opp_sun = rng.randint(0, 12), rng.randint(0, 12)
+    state.score, state.nutrients = rng.randint(0, 40), rng.randint(0, 20)
+    return state
+
+
+def test_pruned_search_is_exact():
+    board = Referee(1).board
+    rng = random.Random(0)
+    # a tiny board: the cells without soil can't be seeded, which keeps the brute force short
+    soil = rng.sample([cell for cell in range(CELL_COUNT) if board.richness[cell] > 0], 10)
+    richness = [value if cell in soil else 0 for cell, value in enumerate(board.richness)]
+    simulator = Simulator(Geometry(board.neighbors), richness)
+    endgame = Endgame(simulator)
+    tested = 0
+    while tested < 30:
+        state = small_state(rng, soil)
+        if not endgame.applies(state):
+            continue  # the bots don't search it either
+        tested += 1
+        endgame.deadline = time.perf_counter() + 60
+        endgame.table.new_search()
+        best = brute_force(simulator, state, {})
+        assert endgame.value(state) == best, state
+        action = endgame.best_action(state, time.perf_counter() + 60)
+        assert action in simulator.actions(state)
+        child = simulator.end_day(state) if action[0] == "WAIT" else simulator.play(state, action)
+        assert brute_force(simulator, child, {}) == best, (state, action)
@@ -0,0 +1,52 @@
+import random
+
+from bitboard import CELL_COUNT, State
+from evolution import Evolution
+from geometry import Geometry
+from referee import Referee
+from simulation import Simulator
+
+
+def opening_state(richness) -> State:
+    state = State()
+    rng = random.Random(4)
+    soil = [cell for cell in range(CELL_COUNT) if richness[cell] > 0]
+    for cell in rng.sample(soil, 8):
+        state.place(cell, rng.randint(1, 3), rng.random() < 0.5)
+    state.day, state.nutrients = 5, 20
+    state.sun, state.opp_sun = 20, 20
+    return state
+
+
+def test_mutations_of_the_same_plan_diverge():
+    board = Referee(2).board
+    evolution = Evolution(Simulator(Geometry(board.neighbors), board.richness), seed=0)
+    state = opening_state(board.richness)
+    played = {tuple(evolution.evaluate(state, [[None]])[1][0]) for _ in range(30)}
+    assert len(played) > 1
+
+
+def test_pondered_plans_are_resumed_on_the_expected_frame():
+    board = Referee(2).board
+    evolution = Evolution(Simulator(Geometry(board.neighbors), board.richness), seed=0)
+    state = opening_state(board.richness)
+    action = evolution.best_action(state, 0)
+    evolution.ponder(state, action, lambda: False)
+    assert evolution.pondered is not None and len(evolution.pondered[1]) > 1
+    pondered = evolution.pondered[1][:]
+    expected = evolution.expected(state, action)
+    resumed = []
+    evolution.evolve = lambda state, population, done: resumed.extend(population)
+    evolution.best_action(expected, 0)
+    assert evolution.reused == 1
+    assert all(any(individual is plan for plan in resumed) for individual in pondered)
+
+
+def test_pondering_stops_when_the_input_is_ready():
+    board = Referee(2).board
+    evolution = Evolution(Simulator(Geometry(board.neighbors), board.richness), seed=0)
+    state = opening_state(board.richness)
+    action = evolution.best_action(state, 0)
+    evaluations = evolution.evaluations
+    evolution.ponder(state, action, lambda: True)
+    assert evolution.pondered is None and evolution.evaluations == evaluations
@@ -0,0 +1,41 @@
+import random
+
+from bitboard import CELL_COUNT, State
+from forecast import Forecast
+from geometry import Geometry
+from referee import Board
+
+
+def random_state(rng: random.Random) -> State:
+    state = State()
+    for cell in rng.sample(range(CELL_COUNT), rng.randrange(4, 20)):
+        state.place(cell, rng.randrange(4), rng.random() < 0.5)
+    return state
+
+
+def test_delta_matches_a_forecast_of_the_changed_state():
+    geometry = Geometry(Board(random.Random(0)).neighbors)
+    rng = random.Random(0)
+    for _ in range(100):
+        state = random_state(rng)
+        day = rng.randrange(23)
+        forecast = Forecast(geometry)
+        forecast.reset(state, day)
+        for cell in range(CELL_COUNT):
+            size = state.size(cell)
+            if size < 0:
+                changes = [(0, True), (0, False)]  # a seed
+            else:
+                changes = [(-1, state.is_mine(cell))]  # a completion
+                if size < 3:
+                    changes.append((size + 1, state.is_mine(cell)))
+            for new_size, is_mine in changes:
+                changed = state.copy()
+                changed.remove(cell)
+                if new_size >= 0:
+                    changed.place(cell, new_size, is_mine)
+                fresh = Forecast(geometry)
+                fresh.reset(changed, day)
+                expected = (fresh.totals[1] - forecast.totals[1],
+                            fresh.totals[0] - forecast.totals[0])
+                assert forecast.delta(cell, new_size, is_mine) == expected, (state, cell, new_size)
@@ -0,0 +1,32 @@
+import io
+
+import hooks
+from hooks import disable_hooks, enable_hooks, hook, report_hooks
+
+
+class Scorer:
+    @hook
+    def score(self, value: int) -> int:
+        return value * 2
+
+
+def test_hooks_count_calls_only_once_enabled():
+    original = Scorer.score
+    try:
+        assert Scorer().score(2) == 4
+        enable_hooks()
+        assert Scorer.score is not original
+        for value in range(3):
+            assert Scorer().score(value) == value * 2
+        stream = io.StringIO()
+        report_hooks(stream)
+        assert "Scorer.score 3x " in stream.getvalue()
+        stream = io.StringIO()
+        report_hooks(stream)
+        assert stream.getvalue() == "hooks\n"  # the numbers restart after a report
+    finally:
+        disable_hooks()
+    assert Scorer.score is original and not hooks.ENABLED
+    stream = io.StringIO()
+    report_hooks(stream)
+    assert stream.getvalue() == ""
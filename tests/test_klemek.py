@@ -0,0 +1,160 @@
+import random
+from typing import List, Tuple
+
+import numpy as np
+
+import klemek
+from bitboard import CELL_COUNT, State, bits, tree_price
+from referee import Referee
+
+# the scalar scorers the Batch of klemek was written from, one candidate at a time
+
+
+def shadowed_trees(game: klemek.Game, cell: int, sun_dir: int, size: int) -> List[klemek.Tree]:
+    trees = [game.cells[i].tree for i in game.geometry.shadows[(cell * 6 + sun_dir) * 4 + size]]
+    return [tree for tree in trees if tree is not None and tree.size <= size]
+
+
+def shadow_source_trees(game: klemek.Game, cell: int, sun_dir: int, size: int) -> List[klemek.Tree]:
+    sources = game.geometry.shadows[(cell * 6 + (sun_dir + 3) % 6) * 4 + 3]
+    trees = [(distance, game.cells[i].tree) for distance, i in enumerate(sources, 1)]
+    return [tree for distance, tree in trees
+            if tree is not None and tree.size >= distance and tree.size >= size]
+
+
+def shadow_score(game: klemek.Game, cell: int, sun_dir: int, size: int, *, offset_own: int = 0,
+                 actors_impact: bool = False) -> Tuple[float, float]:
+    if size == 0:
+        return 0, 0
+    own_score = 0
+    opp_score = 0
+    this = game.cells[cell]
+    for tree in shadowed_trees(game, cell, sun_dir, size):
+        actors = shadow_source_trees(game, tree.id, sun_dir, tree.size)
+        if not this.has_tree or this.tree not in actors:
+            actors += [this]
+        impact_ratio = 1
+        if actors_impact and len(actors) > 1:
+            impact_ratio = 2
+        if tree.is_mine:
+            own_score -= (tree.size + offset_own) / impact_ratio
+        else:
+            opp_score -= tree.size / impact_ratio
+    return own_score, opp_score
+
+
+def seed_score(game: klemek.Game, cell: int, day: int, prefer_unshadowed: bool) -> float:
+    this = game.cells[cell]
+    shadow = 0
+    for delta in range(2, 5):  # direct future
+        own_score, opp_score = shadow_score(game, cell, (day + delta) % 6, delta - 1, offset_own=1)
+        shadow += (own_score - opp_score) / (4 * delta)
+    for delta in range(6):  # full turn
+        own_score, opp_score = shadow_score(game, cell, delta, 3, offset_own=1)
+        shadow += (own_score - opp_score) / (4 * 9)
+
+    shadowed_score = 0
+    for delta in range(2, 5):
+        if game.shadow_map.shadowed(cell, (day + delta) % 6):
+            shadowed_score += 1 / delta
+
+    bonus = 0
+    if shadow == 0 and shadowed_score == 0:
+        bonus = 3 if prefer_unshadowed else 1
+
+    neighbors_score = 0
+    for neighbor in this.neighbors_raw:
+        if neighbor >= 0:
+            other = game.cells[neighbor]
+            neighbors_score += max(other.richness - 1, 0) / 12
+            if other.has_tree:
+                if other.tree.is_mine:
+                    neighbors_score -= other.tree.size * other.richness
+                else:
+                    neighbors_score += other.tree.size * other.richness
+
+    return this.richness + shadow / 2 - shadowed_score + bonus + neighbors_score
+
+
+def grow_sun_diff(game: klemek.Game, tree: klemek.Tree, start_day: int) -> Tuple[float, float]:
+    def score(sun_dir: int, size: int) -> Tuple[float, float]:
+        if size == 0:
+            return 0, 0
+        own_score, opp_score = shadow_score(game, tree.id, sun_dir, size, actors_impact=True)
+        return own_score + (size if not tree.shadowed(sun_dir, size) else 0), opp_score
+
+    own_diff, opp_diff = 0, 0
+    for day in range(start_day + 1, min(start_day + 4, klemek.MAX_DAY + 1)):
+        own_score0, opp_score0 = score(day % 6, tree.size)
+        own_score1, opp_score1 = score(day % 6, tree.size + 1)
+        own_diff += own_score1 - own_score0
+        opp_diff += opp_score1 - opp_score0
+    return own_diff, opp_diff
+
+
+def seedable_mask(game: klemek.Game, tree: klemek.Tree, size: int) -> int:
+    soil = sum(1 << cell.id for cell in game.cells if cell.richness > 0)
+    return game.geometry.range_masks[tree.id * 4 + size] & soil & ~game.state.trees
+
+
+def grow_score(game: klemek.Game, tree: klemek.Tree, day: int, tree_count: List[int]) -> float:
+    params = game.params
+    grow_cost = tree_price(tree_count, tree.size + 1)
+    own_diff, opp_diff = grow_sun_diff(game, tree, day)
+    sun_score = own_diff - opp_diff - grow_cost
+
+    gained = seedable_mask(game, tree, tree.size + 1) & ~seedable_mask(game, tree, tree.size)
+    richnesses = [game.cells[i].richness for i in bits(gained)]
+    impact = sum(richnesses) / (3 * len(richnesses)) if richnesses else 0
+
+    score = sun_score + params.grow_impact * impact
+    richness = params.grow_richness * tree.cell.richness
+    if day < 3:
+        score += richness
+    elif tree_count[3] < params.max_grown:
+        score += richness * (tree.size + 1) ** 2
+    else:
+        score += richness * (tree.size + 1)
+    if tree.shadowed((day + 1) % 6):
+        score -= params.grow_shadowed * grow_cost
+    return score
+
+
+def games():
+    """klemek games loaded with random states of a few maps"""
+    rng = random.Random(0)
+    for seed in range(4):
+        board = Referee(seed).board
+        game = klemek.Game()
+        game.input_cells([(str(cell), str(board.richness[cell]), *map(str, board.neighbors[cell]))
+                          for cell in range(CELL_COUNT)])
+        soil = [cell for cell in range(CELL_COUNT) if board.richness[cell] > 0]
+        for _ in range(40):
+            state = State()
+            for cell in rng.sample(soil, rng.randint(2, 20)):
+                state.place(cell, rng.randint(0, 3), rng.random() < 0.5, rng.random() < 0.2)
+            state.day = rng.randint(1, klemek.MAX_DAY)
+            state.sun, state.nutrients = rng.randint(0, 30), rng.randint(0, 20)
+            game.load_state(state)
+            yield game
+
+
+def test_batch_seed_scores_match_the_scalar_scorer():
+    for game in games():
+        cells = [cell.id for cell in game.cells if cell.richness > 0 and not cell.has_tree]
+        for prefer_unshadowed in (False, True):
+            scores = game.batch.seed_scores(cells, game.day, prefer_unshadowed, game.shadow_map)
+            expected = [seed_score(game, cell, game.day, prefer_unshadowed) for cell in cells]
+            assert list(scores) == expected
+            assert int(np.argmax(scores)) == max(range(len(cells)), key=expected.__getitem__)
+
+
+def test_batch_grow_scores_match_the_scalar_scorer():
+    for game in games():
+        trees = [tree for tree in game.trees if tree.size < 3]
+        if not trees:
+            continue
+        scores = game.batch.grow_scores(trees, game.day, game.tree_count, game.shadow_map)
+        expected = [grow_score(game, tree, game.day, game.tree_count) for tree in trees]
+        assert list(scores) == expected
+        assert int(np.argmax(scores)) == max(range(len(trees)), key=expected.__getitem__)
@@ -0,0 +1,39 @@
+import io
+
+from log import DEBUG, INFO, OFF, WARNING, Log
+
+
+class Unprintable:
+    def __str__(self):
+        raise AssertionError("a disabled record was formatted")
+
+
+def test_records_are_kept_until_dumped():
+    stream = io.StringIO()
+    log = Log(INFO, WARNING, capacity=3, stream=stream)
+    log.debug(Unprintable())
+    for day in range(4):
+        log.info("day", day)
+    assert stream.getvalue() == ""
+    log.dump("turn over budget")
+    assert stream.getvalue().splitlines() == [
+        "--- turn over budget, last 3 records ---", "INFO day 1", "INFO day 2", "INFO day 3"]
+    assert len(log.records) == 0
+
+
+def test_echoed_records_are_written_at_once_and_kept():
+    stream = io.StringIO()
+    log = Log(DEBUG, WARNING, stream=stream)
+    log.warning("illegal", "GROW 3")
+    assert stream.getvalue() == "WARNING illegal GROW 3\n"
+    log.dump("end")
+    assert stream.getvalue().splitlines()[-1] == "WARNING illegal GROW 3"
+
+
+def test_off_writes_nothing():
+    stream = io.StringIO()
+    log = Log(INFO, WARNING, stream=stream)
+    log.set_level(OFF, OFF)
+    log.error(Unprintable())
+    log.dump("end")
+    assert stream.getvalue() == ""
@@ -0,0 +1,31 @@
+import random
+
+from bitboard import State
+from geometry import Geometry
+from moves import LegalMoves
+from protocol import encode
+from referee import Referee
+from simulation import Simulator
+
+
+def test_shuffled_referee_moves_parse_as_generated():
+    rng = random.Random(0)
+    for seed in range(4):
+        referee = Referee(seed)
+        simulator = Simulator(Geometry(referee.board.neighbors), referee.board.richness)
+        while not referee.over:
+            actions = {}
+            for player in referee.active_players():
+                moves = referee.possible_moves(player)
+                shuffled = moves[:]
+                rng.shuffle(shuffled)
+                parsed = LegalMoves.parse(encode(shuffled))
+                state = State.from_trees(
+                    (cell, referee.size[cell], referee.owner[cell] == player, referee.dormant[cell])
+                    for cell in range(len(referee.size)) if referee.size[cell] >= 0)
+                state.sun = referee.sun[player]
+                generated = LegalMoves.generate(simulator, state)
+                assert parsed.actions() == generated.actions()
+                assert list(parsed.sources.items()) == list(generated.sources.items())
+                actions[player] = rng.choice(moves)
+            referee.play(actions)
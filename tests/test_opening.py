@@ -0,0 +1,29 @@
+from bitboard import State
+from geometry import Geometry
+from opening import Opening, canonical, format_entry, map_action, symmetries
+from referee import Referee
+from simulation import Simulator
+
+
+def test_symmetric_maps_play_the_same_entry(tmp_path):
+    referee = Referee(5)
+    neighbors, richness = referee.board.neighbors, referee.board.richness
+    trees = [(cell, referee.size[cell], referee.owner[cell] == 0)
+             for cell in range(len(richness)) if referee.size[cell] >= 0]
+    grown = next(cell for cell, _, is_mine in trees if is_mine)
+    state = State.from_trees((cell, size, is_mine, False) for cell, size, is_mine in trees)
+    key, image = canonical(neighbors, richness, state)
+    path = tmp_path / "opening.book"
+    path.write_text(format_entry(key, [[map_action(("GROW", grown), image)]]) + "\n")
+    geometry = Geometry(neighbors)
+    for symmetry in symmetries(neighbors):
+        moved_richness = [0] * len(richness)
+        for cell, value in enumerate(richness):
+            moved_richness[symmetry[cell]] = value
+        moved = State.from_trees((symmetry[cell], size, is_mine, False) for cell, size, is_mine in trees)
+        moved.sun = 10
+        assert canonical(neighbors, moved_richness, moved)[0] == key
+        opening = Opening.load(neighbors, moved_richness, moved, str(path))
+        assert opening is not None
+        action = opening.next_action(moved, Simulator(geometry, moved_richness))
+        assert action == ("GROW", symmetry[grown])
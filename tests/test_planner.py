@@ -0,0 +1,57 @@
+from bitboard import State, bits
+from geometry import Geometry
+from planner import DayPlanner
+from referee import Referee
+from simulation import WAIT, Simulator
+
+FAR = float("inf")
+
+
+def smallest_first(simulator: Simulator):
+    """a policy growing our smallest tree it can, counting its calls"""
+    def policy(state: State):
+        policy.calls += 1
+        for size in range(3):
+            for cell in bits(state.mine & state.sizes[size] & ~state.dormant):
+                if simulator.is_legal(state, ("GROW", cell)):
+                    return "GROW", cell
+        return WAIT
+    policy.calls = 0
+    return policy
+
+
+def setup():
+    board = Referee(0).board
+    simulator = Simulator(Geometry(board.neighbors), board.richness)
+    small, big = [cell for cell in range(len(board.richness)) if board.richness[cell] > 0][:2]
+    state = State.from_trees([(small, 1, True, False), (big, 2, True, False)])
+    state.day, state.sun = 5, 11
+    return simulator, state, small, big
+
+
+def test_day_is_planned_once_in_its_cheapest_order():
+    simulator, state, small, big = setup()
+    policy = smallest_first(simulator)
+    planner = DayPlanner(simulator, policy)
+    # the policy grows the small tree first, for 4 + 7 sun, the big one first costs 7 + 3
+    played = []
+    for _ in range(3):
+        action = planner.next_action(state, FAR)
+        played.append(action)
+        if action != WAIT:
+            state = simulator.play(state, action)
+    assert played == [("GROW", big), ("GROW", small), WAIT]
+    assert state.sun == 1
+    assert planner.plans == 1
+    calls = policy.calls
+    assert planner.next_action(simulator.end_day(state), FAR) == WAIT
+    assert planner.plans == 2 and policy.calls > calls
+
+
+def test_unexpected_state_is_planned_again():
+    simulator, state, small, big = setup()
+    planner = DayPlanner(simulator, smallest_first(simulator))
+    state = simulator.play(state, planner.next_action(state, FAR))
+    state.sun -= 1
+    assert planner.next_action(state, FAR) == ("GROW", small)
+    assert planner.plans == 2
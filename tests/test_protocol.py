@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from protocol import Reader, encode
+from referee import Referee
+
+
+class Trickle:
+    """a stream handing out a few bytes per read, as a pipe may"""
+
+    def __init__(self, data: bytes, size: int = 7):
+        self.data = data
+        self.size = size
+
+    def read1(self, size: int) -> bytes:
+        chunk, self.data = self.data[:self.size], self.data[self.size:]
+        return chunk
+
+
+def test_reader_reads_back_the_referee_lines():
+    rng = random.Random(0)
+    referee = Referee(3)
+    lines = referee.board.lines()
+    frames = []
+    while not referee.over:
+        player = referee.active_players()[0]
+        frames.append((player, referee.frame_lines(player)))
+        referee.play({player: rng.choice(referee.possible_moves(player))
+                      for player in referee.active_players()})
+    data = encode(lines) + b"".join(encode(frame) for _, frame in frames)
+    reader = Reader(Trickle(data))
+    cells = reader.read_cells()
+    assert [" ".join(map(str, cell)) for cell in cells] == lines[1:]
+    for player, frame_lines in frames:
+        frame = reader.read_frame()
+        tree_count = int(frame_lines[4])
+        assert [frame.day, frame.nutrients, frame.sun, frame.score, frame.opp_sun, frame.opp_score,
+                int(frame.opp_is_waiting)] == [int(value) for value in " ".join(frame_lines[:4]).split()]
+        assert [" ".join(map(str, tree)) for tree in frame.trees] == frame_lines[5:5 + tree_count]
+        assert frame.raw_moves == encode(frame_lines[6 + tree_count:])
+    with pytest.raises(EOFError):
+        reader.read_frame()
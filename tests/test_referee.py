@@ -0,0 +1,100 @@
+from referee import CELL_COUNT, COMPLETE_COST, Referee
+
+
+def empty_referee() -> Referee:
+    """a referee on a board without holes or trees, day 1, both players with 20 sun"""
+    referee = Referee(0)
+    referee.board.richness = [3 if cell < 7 else 2 if cell < 19 else 1 for cell in range(CELL_COUNT)]
+    referee.size = [-1] * CELL_COUNT
+    referee.owner = [-1] * CELL_COUNT
+    referee.dormant = [False] * CELL_COUNT
+    referee.day = 1
+    referee.sun = [20, 20]
+    return referee
+
+
+def place(referee: Referee, cell: int, size: int, player: int):
+    referee.size[cell] = size
+    referee.owner[cell] = player
+
+
+def test_shadow_reaches_as_far_as_the_size():
+    referee = empty_referee()
+    place(referee, 0, 2, 0)
+    sun_dir = 0
+    first = referee.board.neighbors[0][sun_dir]
+    second = referee.board.neighbors[first][sun_dir]
+    third = referee.board.neighbors[second][sun_dir]
+    shadow = referee.shadow(sun_dir)
+    assert shadow[first] == 2 and shadow[second] == 2
+    assert shadow[third] == 0
+    assert shadow[0] == 0
+
+
+def test_shadow_only_spooks_trees_not_bigger():
+    referee = empty_referee()
+    sun_dir = referee.day % 6
+    first = referee.board.neighbors[0][sun_dir]
+    second = referee.board.neighbors[first][sun_dir]
+    place(referee, 0, 2, 0)
+    place(referee, first, 2, 1)  # as big as the caster: no sun
+    place(referee, second, 3, 1)  # bigger: gathers its size
+    sun = list(referee.sun)
+    referee.gather_sun()
+    # the caster is shadowed by nothing, the tree on `first` casts on `second` but it is bigger
+    assert referee.sun == [sun[0] + 2, sun[1] + 3]
+
+
+def test_same_seed_target_is_refunded():
+    referee = empty_referee()
+    place(referee, 1, 1, 0)
+    place(referee, 3, 1, 1)
+    place(referee, 7, 0, 0)  # a seed, so seeding costs player 0 one sun
+    target = 2  # next to both 1 and 3
+    assert referee.board.distance(1, target) == 1 and referee.board.distance(3, target) == 1
+    referee.play({0: f"SEED 1 {target}", 1: f"SEED 3 {target}"})
+    assert referee.size[target] == -1
+    assert referee.sun == [20, 20]
+    assert referee.dormant[1] and referee.dormant[3]
+    assert referee.invalid == [0, 0]
+
+
+def test_completions_of_a_frame_share_the_nutrients():
+    referee = empty_referee()
+    place(referee, 0, 3, 0)  # richness 3, +4
+    place(referee, 8, 3, 1)  # richness 2, +2
+    referee.nutrients = 10
+    referee.play({0: "COMPLETE 0", 1: "COMPLETE 8"})
+    assert referee.score == [10 + 4, 10 + 2]
+    assert referee.nutrients == 8
+    assert referee.sun == [20 - COMPLETE_COST, 20 - COMPLETE_COST]
+    assert referee.size[0] == referee.size[8] == -1
+
+
+def test_nutrients_stop_at_zero():
+    referee = empty_referee()
+    place(referee, 0, 3, 0)
+    referee.nutrients = 0
+    referee.play({0: "COMPLETE 0", 1: "WAIT"})
+    assert referee.score[0] == 4
+    assert referee.nutrients == 0
+
+
+def test_grow_cost_counts_the_trees_of_the_next_size():
+    referee = empty_referee()
+    place(referee, 0, 1, 0)
+    place(referee, 1, 2, 0)
+    place(referee, 2, 2, 0)
+    place(referee, 3, 2, 1)
+    assert referee.grow_cost(0, 0) == 3 + 2
+    referee.play({0: "GROW 0", 1: "WAIT"})
+    assert referee.size[0] == 2 and referee.dormant[0]
+    assert referee.sun[0] == 20 - 5
+
+
+def test_invalid_action_makes_the_player_wait():
+    referee = empty_referee()
+    place(referee, 0, 1, 0)
+    referee.play({0: "COMPLETE 0", 1: "WAIT"})
+    assert referee.invalid[0] == 1
+    assert referee.day == 2  # both waited, a new day started
@@ -0,0 +1,71 @@
+import random
+
+from bitboard import CELL_COUNT, State
+from replay import RECORD, Corpus, Writer, pack, unpack
+from simulation import WAIT
+
+
+def random_state(rng: random.Random) -> State:
+    state = State()
+    for cell in rng.sample(range(CELL_COUNT), 10):
+        state.place(cell, rng.randrange(4), rng.random() < 0.5, rng.random() < 0.3)
+    state.day, state.nutrients = rng.randrange(24), rng.randrange(21)
+    state.sun, state.score = rng.randrange(300), rng.randrange(150)
+    state.opp_sun, state.opp_score = rng.randrange(300), rng.randrange(150)
+    state.opp_is_waiting = rng.random() < 0.5
+    return state
+
+
+ACTIONS = [WAIT, ("COMPLETE", 4), ("GROW", 36), ("SEED", 0, 22)]
+
+
+def test_pack_round_trip():
+    rng = random.Random(0)
+    richness = [rng.randrange(4) for _ in range(CELL_COUNT)]
+    for index in range(50):
+        state = random_state(rng)
+        action = ACTIONS[index % len(ACTIONS)]
+        data = pack(bytes(richness), state, action, -1)
+        assert len(data) == RECORD.size
+        record = unpack(data)
+        assert record.richness == richness
+        assert record.state == state
+        assert record.state.hash_key() == state.hash_key()
+        assert record.action == action
+        assert record.outcome == -1
+
+
+def test_writer_and_corpus(tmp_path):
+    path = str(tmp_path / "games.bin")
+    rng = random.Random(1)
+    richness = [rng.randrange(4) for _ in range(CELL_COUNT)]
+    games = [[(random_state(rng), rng.choice(ACTIONS)) for _ in range(length)]
+             for length in (5, 3)]
+    writer = Writer(path)
+    for game, outcome in zip(games, (1, -1)):
+        for state, action in game:
+            writer.record(richness, state, action)
+        writer.end_game(outcome)
+    writer.record(richness, random_state(rng), WAIT)  # a game never ended is not written
+    writer.close()
+
+    corpus = Corpus(path)
+    expected = [(state, action, outcome)
+                for game, outcome in zip(games, (1, -1)) for state, action in game]
+    assert len(corpus) == len(expected)
+    assert [(record.state, record.action, record.outcome) for record in corpus] == expected
+    assert corpus[-1].state == expected[-1][0]
+
+    table = corpus.array()
+    assert list(table["outcome"]) == [outcome for _, _, outcome in expected]
+    assert list(table["sun"]) == [state.sun for state, _, _ in expected]
+    assert [int(mask) for mask in table["mine"]] == [state.mine for state, _, _ in expected]
+
+
+def test_empty_corpus(tmp_path):
+    path = tmp_path / "empty.bin"
+    path.write_bytes(b"")
+    corpus = Corpus(str(path))
+    assert len(corpus) == 0
+    assert list(corpus) == []
+    assert len(corpus.array()) == 0
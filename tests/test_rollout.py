@@ -0,0 +1,45 @@
+import random
+
+from bitboard import CELL_COUNT, State
+from geometry import Geometry
+from referee import Referee
+from rollout import Playout, Rollout
+from simulation import MAX_DAY, Simulator
+
+
+def random_state(rng: random.Random, richness) -> State:
+    state = State()
+    soil = [cell for cell in range(CELL_COUNT) if richness[cell] > 0]
+    for cell in rng.sample(soil, rng.randint(2, 20)):
+        state.place(cell, rng.randint(0, 3), rng.random() < 0.5, rng.random() < 0.2)
+    state.day = rng.randint(1, MAX_DAY)
+    state.sun, state.opp_sun = rng.randint(0, 25), rng.randint(0, 25)
+    state.nutrients = rng.randint(0, 20)
+    return state
+
+
+def test_rollout_plays_as_the_simulator():
+    board = Referee(2).board
+    simulator = Simulator(Geometry(board.neighbors), board.richness)
+    rollout = Rollout(simulator, seed=1)
+    rng = random.Random(3)
+    for _ in range(300):
+        state = random_state(rng, board.richness)
+        legal = set(simulator.actions(state))
+        playout = Playout.from_state(state)
+        for _ in range(20):
+            assert rollout.sample(playout, 1) in legal
+        assert rollout.greedy(playout, 1) in legal
+        for action in simulator.actions(state):
+            assert rollout.is_legal(playout, 1, action)
+            played = Playout.from_state(state)
+            if action[0] != "WAIT":
+                rollout.apply(played, 1, action)
+            assert played.to_state() == simulator.play(state, action), action
+        if state.day < MAX_DAY:
+            ended = Playout.from_state(state)
+            rollout.end_day(ended)
+            expected = simulator.end_day(state)
+            state_ended = ended.to_state()
+            assert (state_ended.day, state_ended.sun, state_ended.opp_sun, state_ended.dormant) == \
+                (expected.day, expected.sun, expected.opp_sun, expected.dormant)
@@ -0,0 +1,25 @@
+from bitboard import State
+from tracker import Tracker
+
+
+def test_tracker_follows_the_trees_of_a_cell():
+    tracker = Tracker()
+    frames = [
+        (0, [(5, 1, 1, 0)], [5]),  # appearance
+        (1, [(5, 1, 1, 0)], []),
+        (1, [(5, 2, 1, 1)], [5]),  # growth
+        (2, [(5, 3, 1, 0)], [5]),
+        (2, [], [5]),  # completion
+        (3, [(5, 0, 0, 0)], [5]),  # reseeded by the opponent
+    ]
+    versions = []
+    for day, trees, changed in frames:
+        assert tracker.update(day, trees) == changed
+        assert tracker.state == State.from_trees((cell, size, is_mine == 1, is_dormant == 1)
+                                                 for cell, size, is_mine, is_dormant in trees)
+        assert tracker.rows[5] == (trees[0] if trees else None)
+        versions.append(tracker.version)
+    # bumped by every change and every new day, even without a change
+    assert versions == [1, 2, 3, 4, 5, 6]
+    tracker.update(3, [(5, 0, 0, 0)])
+    assert tracker.version == 6
@@ -0,0 +1,77 @@
+from simulation import WAIT
+from transposition import TranspositionTable, decode_action, encode_action
+
+
+def colliding_keys(table: TranspositionTable):
+    """two keys landing in the same slot"""
+    return 5, 5 + table.capacity
+
+
+def test_actions_round_trip():
+    actions = [WAIT, ("COMPLETE", 0), ("COMPLETE", 36), ("GROW", 0), ("GROW", 36),
+               ("SEED", 0, 1), ("SEED", 36, 35), ("SEED", 12, 0)]
+    for action in actions:
+        assert decode_action(encode_action(action)) == action
+    assert len({encode_action(action) for action in actions}) == len(actions)
+
+
+def test_get_needs_the_same_key_and_enough_depth():
+    table = TranspositionTable(1 << 12)
+    table.put(42, 3, 1.5, ("GROW", 7))
+    assert table.get(42, 3) == (1.5, ("GROW", 7))
+    assert table.get(42, 2) == (1.5, ("GROW", 7))
+    assert table.get(42, 4) is None
+    assert table.get(42 + table.capacity, 0) is None
+    table.put(43, 0, -2.0)
+    assert table.get(43) == (-2.0, None)
+
+
+def test_deeper_entry_kept_in_the_same_search():
+    table = TranspositionTable(1 << 12)
+    first, second = colliding_keys(table)
+    table.put(first, 4, 1.0)
+    table.put(second, 2, 2.0)
+    assert table.get(first) == (1.0, None)
+    assert table.get(second) is None
+    table.put(second, 4, 3.0)  # as deep replaces
+    assert table.get(second) == (3.0, None)
+    assert table.get(first) is None
+
+
+def test_same_state_kept_when_deeper():
+    table = TranspositionTable(1 << 12)
+    table.put(9, 5, 1.0)
+    table.put(9, 1, 2.0)
+    assert table.get(9, 5) == (1.0, None)
+    table.new_search()
+    table.put(9, 1, 2.0)
+    assert table.get(9, 5) == (1.0, None)
+    table.put(9, 5, 3.0)  # as deep replaces
+    assert table.get(9, 5) == (3.0, None)
+
+
+def test_older_search_entries_readable_until_replaced():
+    table = TranspositionTable(1 << 12)
+    first, second = colliding_keys(table)
+    table.put(first, 6, 1.0)
+    table.new_search()
+    assert table.get(first, 6) == (1.0, None)
+    table.put(second, 0, 2.0)
+    assert table.get(second) == (2.0, None)
+    assert table.get(first) is None
+
+
+def test_generation_wraps():
+    table = TranspositionTable(1 << 12)
+    for _ in range(256):
+        table.new_search()
+    assert table.generation == 0
+
+
+def test_size_bounded():
+    table = TranspositionTable(1 << 16)
+    used = sum(column.itemsize * len(column) for column in
+               (table.keys, table.values, table.actions, table.depths, table.generations))
+    assert used <= 1 << 16
+    table.clear()
+    assert table.get(0) is None
@@ -0,0 +1,36 @@
+from typing import Iterable, List, Optional, Tuple
+
+from bitboard import State
+
+Row = Tuple[int, int, int, int]  # cell, size, is_mine, is_dormant
+
+
+class Tracker:
+    """trees kept across frames, only the cells that changed are updated"""
+
+    def __init__(self, cell_count: int = 37):
+        self.cell_count = cell_count
+        self.day = -1
+        self.version = 0  # bumped every time the day or the trees change
+        self.rows: List[Optional[Row]] = [None] * cell_count
+        self.state = State()
+
+    def update(self, day: int, trees: Iterable[Row]) -> List[int]:
+        """apply the tree rows of a frame, return the cells that changed"""
+        rows: List[Optional[Row]] = [None] * self.cell_count
+        for row in trees:
+            rows[row[0]] = row
+        old_rows = self.rows
+        changed = [cell for cell in range(self.cell_count) if rows[cell] != old_rows[cell]]
+        for cell in changed:
+            old, row = old_rows[cell], rows[cell]
+            if old is not None:
+                self.state.remove(cell)
+            if row is not None:
+                self.state.place(cell, row[1], row[2] == 1, row[3] == 1)
+        if len(changed) > 0 or day != self.day:
+            self.version += 1
+        self.rows = rows
+        self.day = day
+        return changed
+
@@ -0,0 +1,81 @@
+from array import array
+from typing import Optional, Tuple
+
+from bitboard import CELL_COUNT
+from simulation import WAIT, Action
+
+ENTRY_BYTES = 8 + 8 + 2 + 1 + 1  # key, value, action, depth, generation
+MAX_BYTES = 2 << 20
+NO_ACTION = -1
+
+
+def encode_action(action: Action) -> int:
+    kind = action[0]
+    if kind == "WAIT":
+        return 0
+    if kind == "COMPLETE":
+        return 1 + action[1]
+    if kind == "GROW":
+        return 1 + CELL_COUNT + action[1]
+    return 1 + 2 * CELL_COUNT + action[1] * CELL_COUNT + action[2]
+
+
+def decode_action(code: int) -> Action:
+    if code == 0:
+        return WAIT
+    if code <= CELL_COUNT:
+        return ("COMPLETE", code - 1)
+    if code <= 2 * CELL_COUNT:
+        return ("GROW", code - 1 - CELL_COUNT)
+    source, target = divmod(code - 1 - 2 * CELL_COUNT, CELL_COUNT)
+    return ("SEED", source, target)
+
+
+class TranspositionTable:
+    """values of states by zobrist hash, in flat arrays allocated once
+
+    an entry is replaced by a deeper one, or by any entry once it is left
+    from an older search, except that a shallower entry of the same state
+    never replaces it. the table never holds more than `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        capacity = 1
+        while capacity * 2 * ENTRY_BYTES <= max_bytes:
+            capacity *= 2
+        self.capacity = capacity
+        self.mask = capacity - 1
+        self.keys = array("Q", [0]) * capacity
+        self.values = array("d", [0.0]) * capacity
+        self.actions = array("h", [NO_ACTION]) * capacity
+        self.depths = array("b", [-1]) * capacity  # -1 for an empty slot
+        self.generations = array("B", [0]) * capacity
+        self.generation = 0
+
+    def new_search(self):
+        """older entries can be read until something else needs their slot"""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def clear(self):
+        self.depths = array("b", [-1]) * self.capacity
+
+    def get(self, key: int, depth: int = 0) -> Optional[Tuple[float, Optional[Action]]]:
+        """(value, best action) stored for the state, searched at least `depth` deep"""
+        slot = key & self.mask
+        if self.keys[slot] != key or self.depths[slot] < depth:
+            return None
+        code = self.actions[slot]
+        return self.values[slot], decode_action(code) if code != NO_ACTION else None
+
+    def put(self, key: int, depth: int, value: float, action: Action = None):
+        slot = key & self.mask
+        if self.keys[slot] == key and self.depths[slot] > depth:
+            self.generations[slot] = self.generation  # still of use in this search
+            return
+        if self.depths[slot] > depth and self.generations[slot] == self.generation:
+            return
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.actions[slot] = encode_action(action) if action is not None else NO_ACTION
+        self.depths[slot] = depth
+        self.generations[slot] = self.generation
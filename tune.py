@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import math
+import random
+import argparse
+import dataclasses
+import multiprocessing
+from typing import Dict, List, Tuple
+
+import arena
+import kalioz
+import klemek
+
+# bot driver, parameter set and ranges explored for each tunable bot
+TUNABLE = {
+    "kalioz": (arena.KaliozBot, kalioz.Parameters, kalioz.PARAMETER_RANGES),
+    "klemek": (arena.KlemekBot, klemek.Parameters, klemek.PARAMETER_RANGES),
+}
+
+CHECKPOINT = "tune.json"
+
+
+def sample(rng: random.Random, ranges: Dict[str, Tuple]) -> dict:
+    params = {}
+    for name, (low, high) in ranges.items():
+        if isinstance(low, int) and isinstance(high, int):
+            params[name] = rng.randint(low, high)
+        else:
+            params[name] = round(rng.uniform(low, high), 3)
+    return params
+
+
+def play(job: tuple) -> Tuple[int, int, float]:
+    """points of a candidate against the default parameters on one map, both seats played"""
+    bot, candidate, params, map_seed, search_time = job
+    driver, parameters, _ = TUNABLE[bot]
+    tuned = lambda lines, time: driver(lines, time, parameters(**params))
+    points = 0.0
+    for seat in range(2):
+        players = (tuned, driver) if seat == 0 else (driver, tuned)
+        winner = arena.play_match(*players, map_seed, search_time).winner()
+        points += 0.5 if winner < 0 else 1.0 if winner == seat else 0.0
+    return candidate, map_seed, points / 2
+
+
+class Tuner:
+    """successive halving over random parameter sets, the defaults included
+
+    every round plays the surviving candidates on `eta` times more maps
+    against the default parameters, and keeps the best 1 / `eta` of them.
+    the progress is saved after each map so an interrupted run resumes,
+    along with the arguments of the run: a file of another run is refused.
+    """
+
+    def __init__(self, path: str, bot: str = "kalioz", candidates: int = 27, maps: int = 2,
+                 eta: int = 3, seed: int = 0, search_time: float = 0):
+        self.path = path
+        _, parameters, ranges = TUNABLE[bot]
+        # the run a progress file belongs to, only resumed by the same one
+        settings = {
+            "bot": bot,
+            "candidate_count": candidates,
+            "maps": maps,
+            "eta": eta,
+            "seed": seed,
+            "search_time": search_time,
+            "ranges": {name: list(bounds) for name, bounds in ranges.items()},
+        }
+        if os.path.exists(path):
+            with open(path) as source:
+                self.checkpoint = json.load(source)
+            saved = {key: self.checkpoint.get(key) for key in settings}
+            if saved != settings:
+                changed = ", ".join(key for key in settings if saved[key] != settings[key])
+                raise ValueError(f"{path} was written by another run ({changed} differ), "
+                                 "remove it or choose another checkpoint")
+            return
+        rng = random.Random(seed)
+        defaults = dataclasses.asdict(parameters())
+        self.checkpoint = {
+            **settings,
+            "round": 0,
+            "candidates": [defaults] + [sample(rng, ranges) for _ in range(candidates - 1)],
+            "alive": list(range(candidates)),
+            "points": {},  # "candidate map_seed" -> points
+        }
+        self.save()
+
+    def save(self):
+        temporary = self.path + ".tmp"
+        with open(temporary, "w") as output:
+            json.dump(self.checkpoint, output, indent=1)
+        os.replace(temporary, self.path)
+
+    @property
+    def done(self) -> bool:
+        return len(self.checkpoint["alive"]) <= 1
+
+    def round_maps(self) -> List[int]:
+        state = self.checkpoint
+        count = state["maps"] * state["eta"] ** state["round"]
+        return [state["seed"] + index for index in range(count)]
+
+    def jobs(self) -> List[tuple]:
+        state = self.checkpoint
+        return [
+            (state["bot"], candidate, state["candidates"][candidate], map_seed, state["search_time"])
+            for candidate in state["alive"]
+            for map_seed in self.round_maps()
+            if f"{candidate} {map_seed}" not in state["points"]
+        ]
+
+    def score(self, candidate: int) -> float:
+        maps = self.round_maps()
+        return sum(self.checkpoint["points"][f"{candidate} {map_seed}"] for map_seed in maps) / len(maps)
+
+    def run(self, processes: int = None):
+        with multiprocessing.Pool(processes, initializer=arena.silence) as pool:
+            while not self.done:
+                for candidate, map_seed, points in pool.imap_unordered(play, self.jobs()):
+                    self.checkpoint["points"][f"{candidate} {map_seed}"] = points
+                    self.save()
+                self.halve()
+
+    def halve(self):
+        state = self.checkpoint
+        ranked = sorted(state["alive"], key=self.score, reverse=True)
+        for candidate in ranked:
+            print(f"round {state['round']} candidate {candidate}: {self.score(candidate):.3f}",
+                  file=sys.stderr)
+        state["alive"] = ranked[:math.ceil(len(ranked) / state["eta"])]
+        state["round"] += 1
+        self.save()
+
+    def best(self) -> dict:
+        return self.checkpoint["candidates"][self.checkpoint["alive"][0]]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="tune the strategy constants of a bot by self-play against its defaults")
+    parser.add_argument("bot", choices=TUNABLE)
+    parser.add_argument("-c", "--candidates", type=int, default=27)
+    parser.add_argument("-m", "--maps", type=int, default=2,
+                        help="maps played by each candidate in the first round")
+    parser.add_argument("-e", "--eta", type=int, default=3,
+                        help="candidates kept and maps added between rounds")
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument("-t", "--search-time", type=float, default=0,
+                        help="seconds of search per frame, 0 for greedy play")
+    parser.add_argument("-j", "--jobs", type=int, help="worker processes, one per core by default")
+    parser.add_argument("--checkpoint", default=CHECKPOINT,
+                        help="progress file, resumed if it exists for the same arguments")
+    args = parser.parse_args()
+    try:
+        tuner = Tuner(args.checkpoint, args.bot, args.candidates, args.maps, args.eta,
+                      args.seed, args.search_time)
+    except ValueError as error:
+        parser.error(str(error))
+    tuner.run(args.jobs)
+    print(json.dumps(tuner.best(), indent=1))
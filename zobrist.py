@@ -0,0 +1,28 @@
+import random
+
+# random 64-bit keys xored together to hash a State, fixed so that hashes
+# are the same from one run to the other
+
+CELL_COUNT = 37
+SCALAR_KEYS = 1024  # values of sun and score above are folded back
+
+_rng = random.Random(2021)
+
+
+def _keys(count: int):
+    return [_rng.getrandbits(64) for _ in range(count)]
+
+
+TREE = _keys(CELL_COUNT * 4 * 2)  # TREE[(cell * 4 + size) * 2 + is_mine]
+DORMANT = _keys(CELL_COUNT)
+DAY = _keys(32)
+NUTRIENTS = _keys(32)
+SUN = _keys(SCALAR_KEYS)
+SCORE = _keys(SCALAR_KEYS)
+OPP_SUN = _keys(SCALAR_KEYS)
+OPP_SCORE = _keys(SCALAR_KEYS)
+OPP_IS_WAITING = _keys(2)
+
+
+def tree_key(cell: int, size: int, is_mine: bool) -> int:
+    return TREE[(cell * 4 + size) * 2 + (1 if is_mine else 0)]